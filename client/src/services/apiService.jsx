@@ -8,8 +8,29 @@ const api = axios.create({
   },
 });
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// Poll a background job until it completes, then fetch its report
+export const waitForJob = async (jobId, onProgress) => {
+  while (true) {
+    const { data: job } = await api.get(`/jobs/${jobId}`);
+    if (onProgress) onProgress(job);
+
+    if (job.status === "completed") {
+      const { data: report } = await api.get(`/jobs/${jobId}/report`);
+      return report;
+    }
+    if (job.status === "failed") {
+      const error = new Error(job.error || "Analysis failed.");
+      error.response = { data: { detail: job.error } };
+      throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
 // Upload CSV dataset (and optional PDF) for ML analysis
-export const uploadDatasetWithOptionalPDF = async (formData) => {
+export const uploadDatasetWithOptionalPDF = async (formData, onProgress) => {
   try {
     console.log("Uploading dataset with formData:", [...formData.entries()]);
     console.log("API base URL:", api.defaults.baseURL);
@@ -21,7 +42,7 @@ export const uploadDatasetWithOptionalPDF = async (formData) => {
     });
     
     console.log("Upload response:", response);
-    return response.data;
+    return await waitForJob(response.data.job_id, onProgress);
   } catch (error) {
     console.error("Dataset upload failed:", error);
     console.error("Error details:", error.response?.data || error.message);
@@ -1,15 +1,18 @@
 # controllers/chart_controller.py
 import os
 import shutil
-from app.services.ocr_services import load_dataset
-from app.services.ocr_services import ask_groq_about_chart
+from starlette.concurrency import run_in_threadpool
+from app.services.ocr_services import load_dataset, dataset_preview
+from app.services.ocr_services import ask_groq_about_chart, stream_groq_about_chart
 from app.services.ocr_services import extract_text_from_pdf  # make sure this exists
 from app.services.ocr_services import generate_insight_with_llm   
+from app.services.ocr_cache import ocr_cache_stats
+from app.services.llm_cache import get_llm_cache
 
 UPLOAD_FOLDER = "uploads"
 OUTPUT_FOLDER = "outputs"
 
-def process_uploaded_files(pdf_file, csv_file):
+async def process_uploaded_files(pdf_file, csv_file):
     print("🔍 Processing uploaded files...")
     if not (pdf_file and csv_file):
         raise ValueError("❌ Missing required files.")
@@ -23,15 +26,20 @@ def process_uploaded_files(pdf_file, csv_file):
     print("🔍 Files saved successfully.")
     print("abb m chart wale m text extract krne ki aur ja rah ahu");
 
-    chart_text = extract_text_from_pdf(pdf_path)
+    # OCR, CSV parsing and the dataset summary block; run them off the event loop
+    chart_text, _ = await run_in_threadpool(extract_text_from_pdf, pdf_path)
     print("🔍 Chart text extracted successfully.")
-    df = load_dataset(csv_path)
-    insight = generate_insight_with_llm(chart_text, df)
+    df = await run_in_threadpool(load_dataset, csv_path)
+    preview = await run_in_threadpool(dataset_preview, df)
+    insight = await generate_insight_with_llm(chart_text, df, preview=preview)
     print("🔍 Insight generated successfully. m chart k ander hu hahaaha...")
     return insight
 
-def generate_response_from_question(question, context):
-    return ask_groq_about_chart(question, context)
+async def generate_response_from_question(question, context):
+    return await ask_groq_about_chart(question, context)
+
+def stream_response_from_question(question, context):
+    return stream_groq_about_chart(question, context)
 
 def write_chat_to_file(chat, filename):
     file_path = os.path.join(OUTPUT_FOLDER, filename)
@@ -41,3 +49,9 @@ def write_chat_to_file(chat, filename):
             f.write(f"Q: {entry['question']}\nA: {entry['answer']}\n\n")
     return file_path
 
+
+def get_ocr_cache_stats():
+    return ocr_cache_stats()
+
+def get_llm_cache_stats():
+    return get_llm_cache().stats()
@@ -1,23 +1,43 @@
 import os
+import asyncio
 import pandas as pd
 from fastapi import UploadFile, Request, HTTPException
 from fastapi.templating import Jinja2Templates
-from typing import Dict, Any
+from typing import Dict, Any, Callable
 from datetime import datetime
 from uuid import uuid4
 import traceback
+import hashlib
+import pickle
+import shutil
 
 # from app.modules.newmodelpipeline import EnhancedMLPipeline
-from app.modules.model_pipeline import train_best_model
-from app.services.ocr_services import extract_text_from_pdf, generate_insight_with_llm
-from app.modules.insight_refiner import clean_and_structure, generate_questions
-from app.modules.neweda import AutoEDAPipeline
+# The training, EDA, OCR and insight stacks are imported inside run_upload_job, so the API starts without them
+from app.modules.model_selection import SELECTION_MODES
+from app.modules.imputation import IMPUTATION_STRATEGIES
+from app.modules.stage_graph import StageGraph
 from app.config.db import ml_collection
+from app.services.ingest_services import save_upload_file, read_csv_compact
+from app.utils.disk_cache import file_digest
+from app.services.result_cache import result_cache_key, load_result, store_result, result_cache_stats
+from app.services.job_services import (
+    create_job, submit_job, start_stage, get_job,
+    JOB_QUEUED, JOB_COMPLETED, JOB_FAILED
+)
 
 UPLOAD_FOLDER = "uploads"
 OUTPUT_FOLDER = "outputs"
+# Plots referenced by the report (confusion matrices, regression plots); names are shared between uploads
+CHARTS_FOLDER = "static/charts"
+EDA_REPORT_ARTIFACT = "eda_report.pdf"
 templates = Jinja2Templates(directory="app/templates")
 
+# Stages reported by /jobs/{job_id}; insight stages are skipped when no PDF is present
+UPLOAD_JOB_STAGES = ["parsing", "eda", "training", "eda_insight", "powerbi_insight", "llm_insights"]
+# Parts of the EDA report kept in the job result; per-column profiles and descriptive statistics are left out
+EDA_SUMMARY_KEYS = ["cleaned_shape", "imputation", "outliers", "feature_importance", "stage_graph"]
+EDA_QUALITY_KEYS = ["shape", "duplicate_rows", "potential_issues"]
+
 # 👋 NEW: Function to validate target column suitability based on task type
 def validate_target_suitability(y: pd.Series, task_type: str):
     unique_classes = y.nunique()
@@ -33,19 +53,67 @@ def validate_target_suitability(y: pd.Series, task_type: str):
     return True, ""
 
 
+def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = df.columns.str.strip().str.replace('\n', '', regex=True)
+    df.columns = df.columns.str.encode('ascii', errors='ignore').str.decode('ascii')
+    return df
+
+
+def _parse_csv(csv_filepath: str) -> pd.DataFrame:
+    return _clean_columns(read_csv_compact(csv_filepath))
+
+
+def _prepare_target(df: pd.DataFrame, target_col: str) -> pd.Series:
+    """Only the target column, so the target-independent EDA stages stay shared between targets"""
+    target = df[target_col]
+    # The target keeps its plain dtype so label encoding and validation behave as before
+    if isinstance(target.dtype, pd.CategoricalDtype):
+        target = target.astype(object)
+
+    if target_col.lower() == 'price':
+        target = target.astype(str).str.replace(',', '')
+        target = target.replace({'Ask For Price': None})
+        target = pd.to_numeric(target, errors='coerce')
+    return target
+
+
+def _resolve_target_column(columns, target_col: str) -> str:
+    target_col = target_col.strip()
+    columns_map = {col.strip().lower(): col for col in columns}
+    target_col_clean = target_col.lower()
+
+    print(f"🔍 Cleaned target_col: {target_col_clean}")
+
+    if target_col_clean not in columns_map:
+        raise HTTPException(
+            status_code=400,
+            detail=f"❌ Target column '{target_col}' not found. Available: {list(columns)}"
+        )
+    return columns_map[target_col_clean]
+
+
 async def upload_dataset(
     request: Request,
     file: UploadFile,
     task_type: str,
     target_col: str,
     pdf_file: UploadFile = None,
-    current_user: Dict[str, Any] = None
+    current_user: Dict[str, Any] = None,
+    selection_mode: str = None,
+    imputation_strategy: str = None
 ):
     try:
         print("🔄 Received request to /upload")
 
         if not (file and task_type and target_col):
             raise HTTPException(status_code=400, detail="❌ Missing required fields.")
+        if selection_mode and selection_mode not in SELECTION_MODES:
+            raise HTTPException(status_code=400, detail=f"❌ selection_mode must be one of {list(SELECTION_MODES)}.")
+        if imputation_strategy and imputation_strategy not in IMPUTATION_STRATEGIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"❌ imputation_strategy must be one of {list(IMPUTATION_STRATEGIES)}."
+            )
 
         user_id = current_user["_id"]
         timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
@@ -55,109 +123,283 @@ async def upload_dataset(
         csv_filename = f"{upload_id}_{file.filename}"
         csv_filepath = os.path.join(UPLOAD_FOLDER, csv_filename)
 
-        with open(csv_filepath, "wb") as f:
-            f.write(await file.read())
-
-        df = pd.read_csv(csv_filepath, encoding='utf-8', engine='python')
-        df.columns = df.columns.str.strip().str.replace('\n', '', regex=True)
-        df.columns = df.columns.str.encode('ascii', errors='ignore').str.decode('ascii')
-
-        print("✅ Cleaned columns:", df.columns.tolist())
+        csv_hasher = hashlib.sha256()
+        await save_upload_file(file, csv_filepath, hasher=csv_hasher)
 
-        target_col = target_col.strip()
-        columns_map = {col.strip().lower(): col for col in df.columns}
-        target_col_clean = target_col.lower()
-
-        print(f"🔍 Cleaned target_col: {target_col_clean}")
-
-        if target_col_clean not in columns_map:
-            raise HTTPException(
-                status_code=400,
-                detail=f"❌ Target column '{target_col}' not found. Available: {list(df.columns)}"
-            )
-
-        target_col = columns_map[target_col_clean]
+        # Only the header is parsed here; the full load happens in the job worker
+        header = _clean_columns(pd.read_csv(csv_filepath, encoding='utf-8', nrows=0))
+        target_col = _resolve_target_column(header.columns, target_col)
         print(f"✅ Matched actual column name: {target_col}")
 
-        if target_col.lower() == 'price':
-            df[target_col] = df[target_col].astype(str).str.replace(',', '')
-            df[target_col] = df[target_col].replace({'Ask For Price': None})
-            df[target_col] = pd.to_numeric(df[target_col], errors='coerce')
-
-        # 👋 NEW: Target suitability check before proceeding
-        is_valid, validation_msg = validate_target_suitability(df[target_col], task_type)
-        if not is_valid:
-            raise HTTPException(status_code=400, detail=validation_msg)
-
-        # Run EDA
-        print("🔍 Running EDA pipeline...")
-        auto_eda = AutoEDAPipeline()
-        clean_df, eda_summary = auto_eda.run_analysis(df, task_type=task_type, target_col=target_col)
-
-        os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-        cleaned_filename = f"{upload_id}_cleaned.csv"
-        clean_path = os.path.join(OUTPUT_FOLDER, cleaned_filename)
-        clean_df.to_csv(clean_path, index=False)
-        print("✅ Cleaned CSV saved.")
-
-        # this is for clas based new modelpiple
-        # Train model
-        # print("🔍 Training best model...")
-        # model_train = EnhancedMLPipeline()
-        # report = model_train.train_and_evaluate(clean_df, task_type=task_type, target_col=target_col)
-        
-        #  Train model for old model pipeline
-        print("🔍 Training best model...")
-        best_model, report = train_best_model(clean_df, task_type=task_type)
-
-        # Extract from EDA PDF if exists
-        eda_pdf_path = os.path.join(OUTPUT_FOLDER, f"{upload_id}_eda_report.pdf")
-        if os.path.exists(eda_pdf_path):
-            eda_chart_text = extract_text_from_pdf(eda_pdf_path)
-            eda_insight = generate_insight_with_llm(eda_chart_text, clean_df)
-            report["EDA Chart Insight"] = clean_and_structure(eda_insight)
-            report["EDA Suggested Questions"] = generate_questions(eda_insight)
-
-        # Optional PowerBI PDF upload
+        powerbi_path = None
+        file_digests = {"csv": csv_hasher.hexdigest(), "powerbi": None}
         if pdf_file and pdf_file.filename:
-            print("🔍 Processing Power BI PDF...")
             powerbi_filename = f"{upload_id}_powerbi_{pdf_file.filename}"
             powerbi_path = os.path.join(UPLOAD_FOLDER, powerbi_filename)
-            with open(powerbi_path, "wb") as f:
-                f.write(await pdf_file.read())
-
-            powerbi_text = extract_text_from_pdf(powerbi_path)
-            powerbi_insight = generate_insight_with_llm(powerbi_text, clean_df)
-            report["Power BI Chart Insight"] = clean_and_structure(powerbi_insight)
-            report["PowerBI Suggested Questions"] = generate_questions(powerbi_insight)
-        else:
-            print("⚠️ Power BI file not uploaded. Skipping PDF processing.")
+            pdf_hasher = hashlib.sha256()
+            await save_upload_file(pdf_file, powerbi_path, hasher=pdf_hasher)
+            file_digests["powerbi"] = pdf_hasher.hexdigest()
 
-        print("🔍 Returning response...")
-        return templates.TemplateResponse("result.html", {"request": request, "report": report, "clean_path": clean_path})
+        job_id = create_job(
+            user_id,
+            kind="upload",
+            stages=UPLOAD_JOB_STAGES,
+            params={"upload_id": upload_id, "task_type": task_type, "target_col": target_col,
+                    "selection_mode": selection_mode, "imputation_strategy": imputation_strategy}
+        )
 
         ml_data = await ml_collection.insert_one({
             "user_id": user_id,
             "upload_id": upload_id,
+            "job_id": job_id,
             "csv_path": csv_filepath,
-            "eda_pdf_path": eda_pdf_path,
-            "cleaned_path": clean_path,
+            "powerbi_path": powerbi_path,
             "created_at": datetime.utcnow(),
             "task_type": task_type,
             "target_column": target_col,
             "original_filename": file.filename
         })
         print("🔍 Metadata saved in DB with ID:", ml_data.inserted_id)
-        print("✅ Upload and analysis completed.")
+
+        submit_job(job_id, run_upload_job, csv_filepath, upload_id, task_type, target_col, powerbi_path,
+                   selection_mode=selection_mode, imputation_strategy=imputation_strategy,
+                   file_digests=file_digests)
 
         return {
-            "status": "success",
-            "message": "Upload and processing completed.",
-            "cleaned_data_path": os.path.basename(clean_path),
-            "eda_report_path": os.path.basename(eda_pdf_path),
-            "report": report
+            "status": JOB_QUEUED,
+            "message": "Upload received. Analysis is running in the background.",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+            "report_url": f"/jobs/{job_id}/report"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"❌ Internal error: {str(e)}")
+
+
+async def _generate_insights(chart_texts: Dict[str, str], df: pd.DataFrame, **kwargs) -> Dict[str, Any]:
+    """generate_insights on a fresh event loop; the LLM connection pool is closed before the loop ends"""
+    from app.services.insight_orchestrator import generate_insights
+    from app.services.llm_client import close_llm_client
+
+    try:
+        return await generate_insights(chart_texts, df, **kwargs)
+    finally:
+        await close_llm_client()
+
+
+def _eda_summary(eda_report: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact view of AutoEDAPipeline.run_analysis's report for the job result"""
+    quality = eda_report.get("data_quality") or {}
+    summary = {"data_quality": {key: quality[key] for key in EDA_QUALITY_KEYS if key in quality}}
+    summary.update({key: eda_report[key] for key in EDA_SUMMARY_KEYS if key in eda_report})
+    return summary
+
+
+def _map_chart_paths(value: Any, func: Callable[[str], str]) -> Any:
+    """`value` with every chart path in it (at any depth) replaced by func(path)"""
+    if isinstance(value, dict):
+        return {key: _map_chart_paths(item, func) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_map_chart_paths(item, func) for item in value]
+    if isinstance(value, str) and value.startswith(CHARTS_FOLDER + "/"):
+        return func(value)
+    return value
+
+
+def _result_artifacts(report: Dict[str, Any], eda_pdf_path: str) -> Dict[str, str]:
+    """Files the result refers to, by cache artifact name, so a cache hit can restore them"""
+    artifacts = {EDA_REPORT_ARTIFACT: eda_pdf_path} if os.path.exists(eda_pdf_path) else {}
+
+    def collect(path: str) -> str:
+        if os.path.exists(path):
+            artifacts[os.path.basename(path)] = path
+        return path
+
+    _map_chart_paths(report, collect)
+    return artifacts
+
+
+def run_upload_job(
+    job_id: str,
+    csv_filepath: str,
+    upload_id: str,
+    task_type: str,
+    target_col: str,
+    powerbi_path: str = None,
+    selection_mode: str = None,
+    imputation_strategy: str = None,
+    file_digests: Dict[str, str] = None
+) -> Dict[str, Any]:
+    """EDA, training and insight generation for one upload; runs inside a job worker process"""
+    from app.modules.model_pipeline import train_best_model
+    from app.modules.neweda import AutoEDAPipeline
+    from app.services.ocr_services import extract_text_from_pdf
+
+    start_stage(job_id, "parsing")
+
+    # Same bytes + same parameters + same code => reuse the previous result
+    if not file_digests:
+        file_digests = {"csv": file_digest(csv_filepath),
+                        "powerbi": file_digest(powerbi_path) if powerbi_path else None}
+    cache_key = result_cache_key(file_digests, {
+        "task_type": task_type, "target_col": target_col,
+        "selection_mode": selection_mode, "imputation_strategy": imputation_strategy
+    })
+    cached = load_result(cache_key)
+    if cached:
+        return _restore_cached_result(cached, upload_id, cache_key)
+
+    # Stage-level cache: a new target or strategy on the same file reuses parsing, profiling and cleaning
+    graph = StageGraph()
+    upload = graph.source("upload", csv_filepath, digest=file_digests["csv"])
+    parsed = graph.stage("parse", _parse_csv, [upload])
+    target = graph.stage("prepare_target", _prepare_target, [parsed], {"target_col": target_col})
+    df = parsed.value
+    print("✅ Cleaned columns:", df.columns.tolist())
+
+    # 👋 NEW: Target suitability check before proceeding
+    is_valid, validation_msg = validate_target_suitability(target.value, task_type)
+    if not is_valid:
+        raise ValueError(validation_msg)
+
+    # Run EDA
+    start_stage(job_id, "eda")
+    print("🔍 Running EDA pipeline...")
+    auto_eda = AutoEDAPipeline(imputation_strategy=imputation_strategy)
+    clean_df, eda_summary = auto_eda.run_analysis(df, task_type=task_type, target_col=target_col,
+                                                  graph=graph, source=parsed, target=target)
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    cleaned_filename = f"{upload_id}_cleaned.csv"
+    clean_path = os.path.join(OUTPUT_FOLDER, cleaned_filename)
+    clean_df.to_csv(clean_path, index=False)
+    print("✅ Cleaned CSV saved.")
+
+    # this is for clas based new modelpiple
+    # Train model
+    # print("🔍 Training best model...")
+    # model_train = EnhancedMLPipeline()
+    # report = model_train.train_and_evaluate(clean_df, task_type=task_type, target_col=target_col)
+
+    #  Train model for old model pipeline
+    start_stage(job_id, "training")
+    print("🔍 Training best model...")
+    best_model, report = train_best_model(clean_df, task_type=task_type, selection_mode=selection_mode)
+
+    # Extract from EDA PDF if exists
+    chart_texts, ocr_timings = {}, {}
+    eda_pdf_path = os.path.join(OUTPUT_FOLDER, f"{upload_id}_eda_report.pdf")
+    if os.path.exists(eda_pdf_path):
+        start_stage(job_id, "eda_insight")
+        chart_texts["EDA"], ocr_timings["EDA"] = extract_text_from_pdf(eda_pdf_path)
+
+    # Optional PowerBI PDF upload
+    if powerbi_path:
+        start_stage(job_id, "powerbi_insight")
+        print("🔍 Processing Power BI PDF...")
+        chart_texts["PowerBI"], ocr_timings["PowerBI"] = extract_text_from_pdf(powerbi_path)
+    else:
+        print("⚠️ Power BI file not uploaded. Skipping PDF processing.")
+
+    # Both LLM calls run concurrently on one shared summary of the uploaded (unscaled) data
+    if chart_texts:
+        start_stage(job_id, "llm_insights")
+        summary_target = target_col if target_col in df.columns else target_col.strip().replace(' ', '_')
+        insights = asyncio.run(_generate_insights(chart_texts, df, target_col=summary_target, task_type=task_type))
+        if "EDA" in insights["insights"]:
+            report["EDA Chart Insight"] = insights["insights"]["EDA"]["insight"]
+            report["EDA Suggested Questions"] = insights["insights"]["EDA"]["questions"]
+        if "PowerBI" in insights["insights"]:
+            report["Power BI Chart Insight"] = insights["insights"]["PowerBI"]["insight"]
+            report["PowerBI Suggested Questions"] = insights["insights"]["PowerBI"]["questions"]
+        report["Insight Timings"] = insights["timings"]
+        report["OCR Timings"] = ocr_timings
+    report["EDA Summary"] = _eda_summary(eda_summary)
+
+    print("✅ Upload and analysis completed.")
+    result = {
+        "cleaned_data_path": os.path.basename(clean_path),
+        "eda_report_path": os.path.basename(eda_pdf_path),
+        "report": report
+    }
+    store_result(cache_key, clean_df, best_model, result, _result_artifacts(report, eda_pdf_path))
+    return {**result, "cache": {"hit": False, "key": cache_key}}
+
+
+def _restore_cached_result(cached: Dict[str, Any], upload_id: str, cache_key: str) -> Dict[str, Any]:
+    """Materialise a cached result under this upload's file names"""
+    print("⚡ Result cache hit, skipping EDA, training and insights.")
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    clean_path = os.path.join(OUTPUT_FOLDER, f"{upload_id}_cleaned.csv")
+    cached["clean_df"].to_csv(clean_path, index=False)
+    # The report's "Model File" must hold this upload's model, as after training
+    with open(os.path.join(OUTPUT_FOLDER, "model.pkl"), "wb") as f:
+        pickle.dump(cached["model"], f)
+    # The EDA PDF and plots of the cached run; plots get this upload's names, as later runs overwrite the shared ones
+    artifacts = cached["artifacts"]
+    eda_report_filename = f"{upload_id}_eda_report.pdf"
+    if EDA_REPORT_ARTIFACT in artifacts:
+        shutil.copyfile(artifacts[EDA_REPORT_ARTIFACT], os.path.join(OUTPUT_FOLDER, eda_report_filename))
+
+    def restore_chart(path: str) -> str:
+        name = os.path.basename(path)
+        if name not in artifacts:
+            return path
+        restored = os.path.join(CHARTS_FOLDER, f"{upload_id}_{name}")
+        shutil.copyfile(artifacts[name], restored)
+        return restored
+
+    os.makedirs(CHARTS_FOLDER, exist_ok=True)
+    return {
+        **cached["result"],
+        "report": _map_chart_paths(cached["result"]["report"], restore_chart),
+        "cleaned_data_path": os.path.basename(clean_path),
+        "eda_report_path": eda_report_filename,
+        "cache": {"hit": True, "key": cache_key}
+    }
+
+
+def get_upload_job(job_id: str, current_user: Dict[str, Any]) -> Dict[str, Any]:
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job["user_id"] != current_user["_id"]:
+        raise HTTPException(status_code=403, detail="Access denied: This job does not belong to you.")
+    return job
+
+
+def get_upload_job_status(job_id: str, current_user: Dict[str, Any]) -> Dict[str, Any]:
+    job = get_upload_job(job_id, current_user)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": job["progress"],
+        "stages": job["stages"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    }
+
+
+def get_upload_job_report(job_id: str, current_user: Dict[str, Any]) -> Dict[str, Any]:
+    job = get_upload_job(job_id, current_user)
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=f"❌ Job failed: {job['error']}")
+    if job["status"] != JOB_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is still {job['status']} ({job['progress']}%).")
+    return {"status": "success", "message": "Upload and processing completed.", **job["result"]}
+
+
+def render_upload_job_result(request: Request, job_id: str, current_user: Dict[str, Any]):
+    result = get_upload_job_report(job_id, current_user)
+    clean_path = os.path.join(OUTPUT_FOLDER, result["cleaned_data_path"])
+    return templates.TemplateResponse("result.html", {"request": request, "report": result["report"], "clean_path": clean_path})
+
+
+def get_result_cache_stats() -> Dict[str, Any]:
+    return result_cache_stats()
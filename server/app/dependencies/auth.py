@@ -1,11 +1,13 @@
 # app/dependencies/auth.py
 
+import time
 from typing import Dict, Any, Optional
 from fastapi import Depends, Request, Response, HTTPException
 from fastapi.security import APIKeyCookie
 
 from app.services.auth_services import refresh_tokens
 from app.utils.security import verify_token
+from app.services.session_cache import get_session_cache
 from app.config.db import sessions_collection
 
 # Cookie extractors
@@ -23,24 +25,39 @@ async def verify_authentication(
     Verify authentication from cookies.
     Returns user data if authenticated, None otherwise.
     """
-    # Default - not authenticated
-    user = None
-    
     # If no tokens, return None (not authenticated)
     if not access_token and not refresh_token:
         return None
-    
+
+    start = time.perf_counter()
+    try:
+        return await _authenticate(response, access_token, refresh_token)
+    finally:
+        get_session_cache().record_auth(time.perf_counter() - start)
+
+
+async def _session_is_valid(session_id: str) -> bool:
+    return await sessions_collection.find_one({"_id": session_id, "valid": True}, {"_id": 1}) is not None
+
+
+async def _authenticate(
+    response: Response,
+    access_token: Optional[str],
+    refresh_token: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    # Default - not authenticated
+    user = None
+
     # Try access token first
     if access_token:
         try:
             # Decode the token
             payload = verify_token(access_token)
             
-            # Verify session is still valid
+            # Verify session is still valid (cached for a few seconds, dropped on logout)
             session_id = payload.get("session_id")
             if session_id:
-                session = await sessions_collection.find_one({"_id": session_id, "valid": True})
-                if not session:
+                if not await get_session_cache().is_valid(session_id, _session_is_valid):
                     # Session was invalidated, but we'll still try refresh token
                     raise HTTPException(status_code=401, detail="Session invalidated")
             
@@ -14,6 +14,10 @@ from app.routes.user_routes import router as user_router
 from app.routes.ml_routes import router as ml_router
 from app.routes.chart_routes import router as chart_router
 from app.utils.cleanup import register_cleanup_task
+from app.services.job_services import init_job_store, shutdown_executor
+from app.services.llm_client import close_llm_client
+from app.services.session_cache import close_session_cache
+from app.services.ingest_services import UploadSizeLimitMiddleware
 
 
 app = FastAPI()
@@ -24,6 +28,8 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Innermost, so its 413 still gets the session and CORS headers
+app.add_middleware(UploadSizeLimitMiddleware)
 app.add_middleware(SessionMiddleware, secret_key="hemant123")
 
 # Configure CORS
@@ -55,6 +61,22 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 async def startup_db_check():
     await test_connection()
 
+@app.on_event("startup")
+async def startup_job_store():
+    init_job_store()
+
+@app.on_event("shutdown")
+async def shutdown_job_pool():
+    shutdown_executor()
+
+@app.on_event("shutdown")
+async def shutdown_llm_client():
+    await close_llm_client()
+
+@app.on_event("shutdown")
+async def shutdown_session_cache():
+    await close_session_cache()
+
 app.include_router(user_router, prefix="/users", tags=["Users"])
 # app.include_router(ml_router, prefix="/ml", tags=["ML"])
 app.include_router(ml_router,tags=["ML"])
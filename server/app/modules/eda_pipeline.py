@@ -2,10 +2,11 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder, OrdinalEncoder, StandardScaler
 from sklearn.impute import KNNImputer
-from sklearn.feature_selection import chi2
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 from app.modules.plot_utils import generate_charts
 from app.modules.pdf_generator import generate_pdf_from_charts
+from app.modules.outliers import iqr_outlier_mask
+from app.modules.multicollinearity import vif_scores, drop_high_vif
+from app.modules.feature_screening import screen_features, screening_to_dict
 
 
 def knn_impute(df, n_neighbors=5):
@@ -36,12 +37,14 @@ def clean_numeric_columns(df):
     return df
 
 
-def calculate_vif(df):
+def calculate_vif(df, threshold=5, iterative=False):
     print("🔍 inside calculate vif function")
-    vif_data = pd.DataFrame()
-    vif_data["feature"] = df.columns
-    vif_data["VIF"] = [variance_inflation_factor(df.values, i) for i in range(df.shape[1])]
-    return vif_data[vif_data['VIF'] > 5]['feature'].tolist()
+    # All VIFs from one inverse of the correlation matrix (modules/multicollinearity.py)
+    if iterative:
+        dropped, _ = drop_high_vif(df, threshold=threshold)
+        return dropped
+    vif = vif_scores(df)
+    return vif[vif > threshold].index.tolist()
 
 
 def auto_eda_pipeline(df, task_type="classification", target_col=None):
@@ -82,31 +85,24 @@ def auto_eda_pipeline(df, task_type="classification", target_col=None):
     scaler = StandardScaler()
     X_scaled = pd.DataFrame(scaler.fit_transform(X), columns=X.columns)
 
-    # Step 9: Chi2 feature removal (classification only)
+    # Step 9: Feature screening (chi2 on counts, ANOVA F otherwise) on the unscaled features;
+    # non-significant features are removed for classification only
+    screening = screen_features(X, y, task_type)
     chi2_removed = []
     if task_type == "classification":
-        for col in X_scaled.select_dtypes(include='float64').columns:
-            try:
-                stat, p = chi2(X_scaled[[col]], y)
-                if p[0] > 0.05:
-                    chi2_removed.append(col)
-                    X_scaled.drop(columns=[col], inplace=True)
-            except:
-                continue
+        weak = screening.index[~screening["significant"]].tolist()
+        # Never drop every feature; the best-ranked one always stays
+        chi2_removed = weak if len(weak) < len(screening) else weak[1:]
+        X_scaled.drop(columns=chi2_removed, inplace=True)
 
     # Step 10: VIF-based multicollinearity removal
     vif_cols = calculate_vif(X_scaled)
     X_scaled.drop(columns=vif_cols, inplace=True)
 
     # Step 11: Outlier removal using IQR
-    Q1 = X_scaled.quantile(0.25)
-    Q3 = X_scaled.quantile(0.75)
-    IQR = Q3 - Q1
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
-    mask = ~((X_scaled < lower) | (X_scaled > upper)).any(axis=1)
+    mask, outlier_summary = iqr_outlier_mask(X_scaled, factor=1.5)
     X_clean = X_scaled[mask]
-    y_clean = y.loc[mask]
+    y_clean = pd.Series(y).iloc[mask]
 
     # Final cleaned DataFrame
     final_df = pd.concat([X_clean.reset_index(drop=True), y_clean.reset_index(drop=True)], axis=1)
@@ -126,7 +122,10 @@ def auto_eda_pipeline(df, task_type="classification", target_col=None):
     report['shape_before'] = df.shape
     report['shape_after'] = final_df.shape
     report['outliers_removed'] = int(df.shape[0] - final_df.shape[0])
+    report['outlier_columns'] = outlier_summary['columns']
+    report['outliers_removed_by_factor'] = outlier_summary['rows_removed_by_factor']
     report['chi2_removed'] = chi2_removed
+    report['feature_screening'] = screening_to_dict(screening)
     report['vif_removed'] = vif_cols
     report['charts'] = charts
     report['pdf'] = pdf_path
@@ -0,0 +1,74 @@
+# modules/ensembles.py
+
+from typing import List, Tuple, Any, Optional
+
+import numpy as np
+
+ENSEMBLE_MODES = ("averaging", "stacking", "refit")
+
+
+def class_scores(model, X, classes: np.ndarray) -> np.ndarray:
+    """Class probabilities in `classes` order; one-hot predictions for models without predict_proba"""
+    if hasattr(model, "predict_proba"):
+        try:
+            proba = model.predict_proba(X)
+            aligned = np.zeros((proba.shape[0], len(classes)))
+            aligned[:, np.searchsorted(classes, model.classes_)] = proba
+            return aligned
+        except Exception:
+            pass
+    return one_hot(model.predict(X), classes)
+
+
+def one_hot(y_pred, classes: np.ndarray) -> np.ndarray:
+    scores = np.zeros((len(y_pred), len(classes)))
+    scores[np.arange(len(y_pred)), np.searchsorted(classes, np.asarray(y_pred))] = 1.0
+    return scores
+
+
+def average_outputs(outputs: List[np.ndarray]) -> np.ndarray:
+    return np.mean(np.stack(outputs), axis=0)
+
+
+def stack_features(outputs: List[np.ndarray]) -> np.ndarray:
+    """Meta-learner input: base model outputs side by side"""
+    return np.column_stack([np.asarray(out).reshape(len(out), -1) for out in outputs])
+
+
+class PrefitVotingEnsemble:
+    """Soft voting / averaging over estimators that are already fitted; fit() is never called on them"""
+
+    def __init__(self, estimators: List[Tuple[str, Any]], task_type: str, classes: Optional[np.ndarray] = None):
+        self.estimators = estimators
+        self.task_type = task_type
+        self.classes_ = classes
+
+    def predict_proba(self, X) -> np.ndarray:
+        return average_outputs([class_scores(model, X, self.classes_) for _, model in self.estimators])
+
+    def predict(self, X) -> np.ndarray:
+        if self.task_type == "classification":
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return average_outputs([model.predict(X) for _, model in self.estimators])
+
+
+class PrefitStackingEnsemble:
+    """Meta-learner over the outputs of already fitted base estimators"""
+
+    def __init__(self, estimators: List[Tuple[str, Any]], meta_model, task_type: str,
+                 classes: Optional[np.ndarray] = None):
+        self.estimators = estimators
+        self.meta_model = meta_model
+        self.task_type = task_type
+        self.classes_ = classes
+
+    def _features(self, X) -> np.ndarray:
+        if self.task_type == "classification":
+            return stack_features([class_scores(model, X, self.classes_) for _, model in self.estimators])
+        return stack_features([model.predict(X) for _, model in self.estimators])
+
+    def predict(self, X) -> np.ndarray:
+        return self.meta_model.predict(self._features(X))
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.meta_model.predict_proba(self._features(X))
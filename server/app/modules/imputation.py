@@ -0,0 +1,175 @@
+# modules/imputation.py
+
+import os
+import time
+import logging
+from typing import Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+IMPUTATION_STRATEGIES = ("auto", "knn", "approx_knn", "iterative", "median")
+IMPUTATION_STRATEGY = os.getenv("IMPUTATION_STRATEGY", "auto")
+
+# `auto` uses exact KNN up to KNN_MAX_ROWS and sampled iterative imputation beyond
+# (see benchmarks/bench_imputation.py for the numbers behind the default)
+KNN_MAX_ROWS = int(os.getenv("KNN_MAX_ROWS", "20000"))
+# Reference rows the sampled strategies are fitted on, and rows imputed per batch
+IMPUTE_SAMPLE_ROWS = int(os.getenv("IMPUTE_SAMPLE_ROWS", "10000"))
+IMPUTE_CHUNK_ROWS = 5000
+
+
+def choose_strategy(n_rows: int) -> str:
+    return "knn" if n_rows <= KNN_MAX_ROWS else "iterative"
+
+
+def _fill_median(values: np.ndarray, medians: np.ndarray) -> np.ndarray:
+    rows, cols = np.where(np.isnan(values))
+    values[rows, cols] = medians[cols]
+    return values
+
+
+def _transform_in_chunks(imputer, values: np.ndarray) -> np.ndarray:
+    return np.vstack([
+        imputer.transform(values[start:start + IMPUTE_CHUNK_ROWS])
+        for start in range(0, len(values), IMPUTE_CHUNK_ROWS)
+    ])
+
+
+def impute_array(
+    values: np.ndarray,
+    strategy: str = "auto",
+    n_neighbors: int = 5,
+    random_state: int = 42
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Fill NaNs in a float matrix. Only rows that contain a NaN are transformed;
+    complete rows are returned untouched.
+
+    - knn: KNNImputer fitted on every row (distance cost is missing_rows x n_rows)
+    - approx_knn: KNNImputer fitted on a random sample, applied in chunks
+    - iterative: IterativeImputer fitted on a random sample
+    - median: per-column medians
+    """
+    start = time.perf_counter()
+    values = np.array(values, dtype=np.float64)
+    if strategy == "auto":
+        strategy = choose_strategy(len(values))
+    if strategy not in IMPUTATION_STRATEGIES:
+        raise ValueError(f"Unknown imputation strategy '{strategy}'. Choose from {IMPUTATION_STRATEGIES}")
+
+    missing_rows = np.isnan(values).any(axis=1)
+    info = {"strategy": strategy, "rows": int(len(values)), "rows_imputed": int(missing_rows.sum())}
+    if not missing_rows.any():
+        info["seconds"] = round(time.perf_counter() - start, 3)
+        return values, info
+
+    with np.errstate(all="ignore"):
+        medians = np.nan_to_num(np.nanmedian(values, axis=0))
+        # Standardise so neighbour distances are not dominated by large-valued columns
+        means = np.nan_to_num(np.nanmean(values, axis=0))
+        stds = np.nan_to_num(np.nanstd(values, axis=0))
+    stds[stds == 0] = 1.0
+    targets = values[missing_rows]
+
+    if strategy == "median":
+        filled = _fill_median(targets, medians)
+    else:
+        rng = np.random.RandomState(random_state)
+        if strategy == "knn" or len(values) <= IMPUTE_SAMPLE_ROWS:
+            reference = values
+        else:
+            reference = values[rng.choice(len(values), IMPUTE_SAMPLE_ROWS, replace=False)]
+        info["reference_rows"] = int(len(reference))
+
+        if strategy == "iterative":
+            from sklearn.experimental import enable_iterative_imputer  # noqa: F401
+            from sklearn.impute import IterativeImputer
+            imputer = IterativeImputer(max_iter=5, random_state=random_state, keep_empty_features=True)
+        else:
+            from sklearn.impute import KNNImputer
+            imputer = KNNImputer(n_neighbors=n_neighbors, keep_empty_features=True)
+        imputer.fit((reference - means) / stds)
+        filled = _transform_in_chunks(imputer, (targets - means) / stds) * stds + means
+        # Whatever the model could not fill (e.g. a column empty in the sample) falls back to the median
+        filled = _fill_median(filled, medians)
+
+    values[missing_rows] = filled
+    info["seconds"] = round(time.perf_counter() - start, 3)
+    return values, info
+
+
+def _column_modes(df: pd.DataFrame, cols) -> Dict[str, Any]:
+    modes = {}
+    for col in cols:
+        mode = df[col].mode(dropna=True)
+        if len(mode):
+            modes[col] = mode.iloc[0]
+    return modes
+
+
+def _vote_categories(
+    features: np.ndarray,
+    labels: pd.Series,
+    n_neighbors: int,
+    sample: bool,
+    random_state: int
+) -> pd.Series:
+    """Fill missing labels with the majority label of the nearest rows (in `features`) that have one"""
+    from sklearn.neighbors import NearestNeighbors
+
+    codes, uniques = pd.factorize(labels)
+    missing = np.flatnonzero(codes < 0)
+    known = np.flatnonzero(codes >= 0)
+    if sample and len(known) > IMPUTE_SAMPLE_ROWS:
+        known = np.random.RandomState(random_state).choice(known, IMPUTE_SAMPLE_ROWS, replace=False)
+    k = min(n_neighbors, len(known))
+    index = NearestNeighbors(n_neighbors=k).fit(features[known])
+    # Majority vote; the small rank weight lets the nearest neighbour break ties
+    weights = 1.0 + (k - np.arange(k)) * 1e-6
+    filled = labels.copy()
+    for start in range(0, len(missing), IMPUTE_CHUNK_ROWS):
+        rows = missing[start:start + IMPUTE_CHUNK_ROWS]
+        _, neighbours = index.kneighbors(features[rows])
+        votes = np.zeros((len(rows), len(uniques)))
+        np.add.at(votes, (np.repeat(np.arange(len(rows)), k), codes[known][neighbours].ravel()), np.tile(weights, len(rows)))
+        filled.iloc[rows] = np.asarray(uniques, dtype=object)[votes.argmax(axis=1)]
+    return filled
+
+
+def impute_frame(df: pd.DataFrame, strategy: str = "auto", n_neighbors: int = 5,
+                 random_state: int = 42) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Impute a mixed DataFrame. Numeric columns go through impute_array.
+    Text/category columns are nominal, so they get a mode: the majority label
+    of the nearest rows (on the imputed numeric columns) for knn/approx_knn,
+    the column mode for median/iterative.
+    """
+    if strategy == "auto":
+        strategy = choose_strategy(len(df))
+    cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    num_cols = [col for col in df.columns if col not in cat_cols]
+    numeric = df[num_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+    values, info = impute_array(numeric, strategy, n_neighbors, random_state)
+    imputed = df.copy()
+    imputed[num_cols] = values
+
+    cat_missing = [col for col in cat_cols if df[col].isna().any() and df[col].notna().any()]
+    if strategy in ("knn", "approx_knn") and num_cols:
+        with np.errstate(all="ignore"):
+            stds = np.nan_to_num(values.std(axis=0))
+        stds[stds == 0] = 1.0
+        features = (values - values.mean(axis=0)) / stds
+        for col in cat_missing:
+            imputed[col] = _vote_categories(features, df[col], n_neighbors, strategy == "approx_knn", random_state)
+    else:
+        for col, mode in _column_modes(df, cat_missing).items():
+            imputed[col] = df[col].fillna(mode)
+
+    missing_rows = np.isnan(numeric).any(axis=1) | df[cat_missing].isna().any(axis=1).to_numpy()
+    info["rows_imputed"] = int(missing_rows.sum())
+    logging.info(f"✅ Imputed {info['rows_imputed']} of {info['rows']} rows with '{info['strategy']}' "
+                 f"in {info['seconds']}s")
+    info["categorical_columns"] = cat_cols
+    return imputed, info
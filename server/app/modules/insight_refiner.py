@@ -1,25 +1,54 @@
 # modules/insight_refiner.py
 
+import os
 import re
-import spacy
 import random
+import threading
 import traceback
 
+NLP_MODEL = os.getenv("NLP_MODEL", "en_core_web_sm")
+# Noun chunks need tok2vec, tagger, attribute_ruler and parser only
+NLP_EXCLUDE = ["ner", "lemmatizer"]
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "32"))
+# Load the model when a job worker starts instead of in its first insight job (the API never needs it)
+NLP_PRELOAD = os.getenv("NLP_PRELOAD", "false").lower() == "true"
 
-import spacy
-import traceback
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """Process-wide spaCy pipeline, loaded on first use without the components noun chunking does not need"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = _load_nlp()
+    return _nlp
+
+def _load_nlp():
+    import spacy  # Deferred: importing spaCy alone costs about a second
+
+    try:
+        return spacy.load(NLP_MODEL, exclude=NLP_EXCLUDE)
+    except OSError:
+        print(f"🔄 '{NLP_MODEL}' not found. Attempting to download it...")
+        from spacy.cli import download
+        download(NLP_MODEL)
+        return spacy.load(NLP_MODEL, exclude=NLP_EXCLUDE)
+    except Exception:
+        print("❌ Unexpected error while loading spaCy model:")
+        print(traceback.format_exc())
+        raise RuntimeError(f"Could not load spaCy model '{NLP_MODEL}'")
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("🔄 'en_core_web_sm' not found. Attempting to download it...")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-except Exception:
-    print("❌ Unexpected error while loading spaCy model:")
-    print(traceback.format_exc())
-    raise RuntimeError("Could not load spaCy model 'en_core_web_sm'")
+def preload_nlp():
+    """Job worker initializer; a failure here must not break the pool, the model then loads on first use"""
+    if not NLP_PRELOAD:
+        return
+    try:
+        get_nlp()
+    except Exception as e:
+        print(f"⚠️ spaCy preload failed, loading on first use instead: {e}")
 
 
 TEMPLATES = [
@@ -30,10 +59,15 @@ TEMPLATES = [
     "How can we reduce or increase {Y} by changing {X}?"
 ]
 
+FALLBACK_QUESTION = "What are the implications of this insight?"
+
+def _noun_chunks(doc):
+    return list(set([chunk.text.strip() for chunk in doc.noun_chunks if len(chunk.text.strip()) > 2]))
+
 def extract_entities(text):
     try:
-        doc = nlp(text)
-        chunks = list(set([chunk.text.strip() for chunk in doc.noun_chunks if len(chunk.text.strip()) > 2]))
+        doc = get_nlp()(text)
+        chunks = _noun_chunks(doc)
         return chunks
     except Exception as e:
         error_trace = traceback.format_exc()
@@ -41,24 +75,44 @@ def extract_entities(text):
         print(error_trace)
         return []
 
-def generate_questions(text):
+def extract_entities_batch(texts):
+    """extract_entities for several texts in one nlp.pipe pass"""
     try:
-        entities = extract_entities(text)
-        if len(entities) < 2:
-            return ["What are the implications of this insight?"]
+        return [_noun_chunks(doc) for doc in get_nlp().pipe(texts, batch_size=NLP_BATCH_SIZE)]
+    except Exception as e:
+        print("⚠️ Error in extract_entities_batch:")
+        print(traceback.format_exc())
+        return [[] for _ in texts]
+
+def _questions_from_entities(entities):
+    if len(entities) < 2:
+        return [FALLBACK_QUESTION]
 
-        questions = []
-        for _ in range(min(3, len(entities))):
-            X, Y = random.sample(entities, 2)
-            template = random.choice(TEMPLATES)
-            questions.append(template.format(X=X, Y=Y))
-        return questions
+    questions = []
+    for _ in range(min(3, len(entities))):
+        X, Y = random.sample(entities, 2)
+        template = random.choice(TEMPLATES)
+        questions.append(template.format(X=X, Y=Y))
+    return questions
+
+def generate_questions(text):
+    try:
+        return _questions_from_entities(extract_entities(text))
 
     except Exception as e:
         error_trace = traceback.format_exc()
         print("⚠️ Error in generate_questions:")
         print(error_trace)
-        return ["What are the implications of this insight?"]
+        return [FALLBACK_QUESTION]
+
+def generate_questions_batch(texts):
+    """generate_questions for several insights, parsing them with spaCy in one batch"""
+    try:
+        return [_questions_from_entities(entities) for entities in extract_entities_batch(texts)]
+    except Exception as e:
+        print("⚠️ Error in generate_questions_batch:")
+        print(traceback.format_exc())
+        return [[FALLBACK_QUESTION] for _ in texts]
 
 def clean_and_structure(insight_block):
     try:
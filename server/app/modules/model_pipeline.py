@@ -16,6 +16,8 @@ from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, Grad
 from sklearn.svm import SVC, SVR
 from imblearn.over_sampling import SMOTE, RandomOverSampler
 from xgboost import XGBClassifier, XGBRegressor
+from app.modules.training_pool import fit_candidates
+from app.modules.model_selection import successive_halving, MODEL_SELECTION_MODE
 
 warnings.filterwarnings("ignore")
 
@@ -49,7 +51,7 @@ def plot_regression(y_true, y_pred, model_name):
     plt.close()
     return path
 
-def train_best_model(df, task_type="classification"):
+def train_best_model(df, task_type="classification", n_workers=None, model_timeout=None, selection_mode=None):
     print("🔍 Starting model training...")
     X = df.iloc[:, :-1]
     y = df.iloc[:, -1]
@@ -72,40 +74,76 @@ def train_best_model(df, task_type="classification"):
 
         X_train, y_train = sampler.fit_resample(X_train, y_train)
 
-    # Define models
+    # Define models (fixed seeds keep the winner independent of worker scheduling)
     models = {
         "classification": {
             "Logistic Regression": LogisticRegression(max_iter=1000),
-            "Decision Tree": DecisionTreeClassifier(),
-            "Random Forest": RandomForestClassifier(),
-            "Gradient Boosting": GradientBoostingClassifier(),
-            "SVM": SVC(probability=True)
+            "Decision Tree": DecisionTreeClassifier(random_state=42),
+            "Random Forest": RandomForestClassifier(random_state=42),
+            "Gradient Boosting": GradientBoostingClassifier(random_state=42),
+            "SVM": SVC(probability=True, random_state=42)
         },
         "regression": {
             "Linear Regression": LinearRegression(),
-            "Decision Tree Regressor": DecisionTreeRegressor(),
-            "Random Forest Regressor": RandomForestRegressor(),
-            "Gradient Boosting Regressor": GradientBoostingRegressor(),
+            "Decision Tree Regressor": DecisionTreeRegressor(random_state=42),
+            "Random Forest Regressor": RandomForestRegressor(random_state=42),
+            "Gradient Boosting Regressor": GradientBoostingRegressor(random_state=42),
             "SVR": SVR()
         }
     }
 
+    # GridSearch on XGBoost runs alongside the other candidates; n_jobs=1 avoids oversubscribing the pool
+    param_grid = {'n_estimators': [100], 'learning_rate': [0.1], 'max_depth': [3]}
+    xgb = XGBClassifier(use_label_encoder=False, eval_metric='logloss', random_state=42) if is_classification else XGBRegressor(random_state=42)
+    grid = GridSearchCV(xgb, param_grid, scoring='f1_macro' if is_classification else 'r2', cv=3, n_jobs=1)
+
+    candidates = dict(models[task_type])
+    candidates["XGBoost (Tuned)"] = grid
+
+    selection_mode = selection_mode or MODEL_SELECTION_MODE
+    selection_budget = None
+    if selection_mode == "halving":
+        print("🔍 Running successive halving to shortlist candidates...")
+        scorer = (lambda y_true, y_pred: f1_score(y_true, y_pred, average='macro')) if is_classification else r2_score
+        finalists, selection_budget = successive_halving(
+            candidates, X_train, y_train, scorer, stratify=is_classification, n_workers=n_workers
+        )
+        candidates = {name: candidates[name] for name in finalists}
+
+    print(f"🔍 Training {len(candidates)} candidate models in parallel...")
+    fitted = fit_candidates(candidates, X_train, y_train, X_test, n_workers=n_workers, timeout=model_timeout)
+
+    if selection_budget is not None:
+        for name, result in fitted.items():
+            selection_budget[name]["samples_seen"] += int(len(y_train))
+            selection_budget[name]["full_fit_seconds"] = result.get("fit_time")
+
     best_model = None
     best_model_name = None
     best_score = -float("inf")
     best_report = None
     best_plot_path = None
+    best_params = {}
     model_table = []
+    skipped_models = {}
 
-    for name, model in models[task_type].items():
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
+    for name, result in fitted.items():
+        if "error" in result:
+            skipped_models[name] = result["error"]
+            continue
+
+        model = result["model"]
+        y_pred = result["y_pred"]
+        plot_name = "XGBoost_Tuned" if name == "XGBoost (Tuned)" else name
+        if name == "XGBoost (Tuned)":
+            best_params = model.best_params_
+            model = model.best_estimator_
 
         if is_classification:
             acc = accuracy_score(y_test, y_pred)
             f1 = f1_score(y_test, y_pred, average='macro')
             report = classification_report(y_test, y_pred, output_dict=True)
-            plot_path = plot_conf_matrix(y_test, y_pred, name)
+            plot_path = plot_conf_matrix(y_test, y_pred, plot_name)
             score = f1
             model_table.append({
                 "Model": name,
@@ -117,7 +155,7 @@ def train_best_model(df, task_type="classification"):
             r2 = r2_score(y_test, y_pred)
             mse = mean_squared_error(y_test, y_pred)
             report = {"R2 Score": round(r2, 4), "MSE": round(mse, 4)}
-            plot_path = plot_regression(y_test, y_pred, name)
+            plot_path = plot_regression(y_test, y_pred, plot_name)
             score = r2
             model_table.append({
                 "Model": name,
@@ -133,46 +171,8 @@ def train_best_model(df, task_type="classification"):
             best_report = report
             best_plot_path = plot_path
 
-    # GridSearch on XGBoost
-    print("🔍 Running GridSearch on XGBoost...")
-    param_grid = {'n_estimators': [100], 'learning_rate': [0.1], 'max_depth': [3]}
-    xgb = XGBClassifier(use_label_encoder=False, eval_metric='logloss') if is_classification else XGBRegressor()
-    grid = GridSearchCV(xgb, param_grid, scoring='f1_macro' if is_classification else 'r2', cv=3, n_jobs=-1)
-    grid.fit(X_train, y_train)
-    xgb_best = grid.best_estimator_
-    y_pred = xgb_best.predict(X_test)
-
-    if is_classification:
-        acc = accuracy_score(y_test, y_pred)
-        f1 = f1_score(y_test, y_pred, average='macro')
-        plot_path = plot_conf_matrix(y_test, y_pred, "XGBoost_Tuned")
-        report = classification_report(y_test, y_pred, output_dict=True)
-        score = f1
-        model_table.append({
-            "Model": "XGBoost (Tuned)",
-            "Accuracy": round(acc * 100, 2),
-            "Macro F1": round(f1 * 100, 2),
-            "Confusion Matrix": plot_path
-        })
-    else:
-        r2 = r2_score(y_test, y_pred)
-        mse = mean_squared_error(y_test, y_pred)
-        plot_path = plot_regression(y_test, y_pred, "XGBoost_Tuned")
-        report = {"R2 Score": round(r2, 4), "MSE": round(mse, 4)}
-        score = r2
-        model_table.append({
-            "Model": "XGBoost (Tuned)",
-            "R² Score": round(r2, 4),
-            "MSE": round(mse, 4),
-            "Regression Plot": plot_path
-        })
-
-    if score > best_score:
-        best_model = xgb_best
-        best_model_name = "XGBoost (Tuned)"
-        best_score = score
-        best_report = report
-        best_plot_path = plot_path
+    if best_model is None:
+        raise RuntimeError(f"❌ No model finished training: {skipped_models}")
 
     # Save best model
     os.makedirs("outputs", exist_ok=True)
@@ -185,7 +185,11 @@ def train_best_model(df, task_type="classification"):
         "Evaluation Report": best_report,
         "Plot Path": best_plot_path,
         "Comparison Table": model_table,
-        "Best Parameters": grid.best_params_,
+        "Training Time (s)": {name: result["fit_time"] for name, result in fitted.items() if "fit_time" in result},
+        "Skipped Models": skipped_models,
+        "Selection Mode": selection_mode,
+        "Selection Budget": selection_budget,
+        "Best Parameters": best_params,
         "Model File": "outputs/model.pkl",
         "Task Type": "classification" if is_classification else "regression"
-    }
\ No newline at end of file
+    }
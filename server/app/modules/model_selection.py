@@ -0,0 +1,112 @@
+# modules/model_selection.py
+
+import os
+import math
+import logging
+from typing import Dict, Any, List, Tuple, Callable, Optional
+
+import numpy as np
+
+from app.modules.training_pool import fit_candidates
+
+SELECTION_MODES = ("full", "halving")
+MODEL_SELECTION_MODE = os.getenv("MODEL_SELECTION_MODE", "full")
+
+HALVING_MIN_SAMPLES = int(os.getenv("HALVING_MIN_SAMPLES", "500"))
+HALVING_ETA = int(os.getenv("HALVING_ETA", "3"))
+HALVING_FINALISTS = int(os.getenv("HALVING_FINALISTS", "2"))
+HALVING_VALIDATION_SIZE = 0.2
+
+
+def _subsample(X, y, n: int, stratify: bool, random_state: int):
+    from sklearn.model_selection import train_test_split
+    if n >= len(y):
+        return X, y
+    try:
+        X_sub, _, y_sub, _ = train_test_split(
+            X, y, train_size=n, random_state=random_state, stratify=y if stratify else None
+        )
+    except ValueError:
+        # Classes too rare to stratify at this size
+        X_sub, _, y_sub, _ = train_test_split(X, y, train_size=n, random_state=random_state)
+    return X_sub, y_sub
+
+
+def successive_halving(
+    candidates: Dict[str, Any],
+    X_train,
+    y_train,
+    scorer: Callable[[Any, Any], float],
+    stratify: bool = False,
+    min_samples: int = HALVING_MIN_SAMPLES,
+    eta: int = HALVING_ETA,
+    n_finalists: int = HALVING_FINALISTS,
+    n_workers: Optional[int] = None,
+    random_state: int = 42
+) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """
+    Score every candidate on growing subsamples of the training data and keep
+    the best 1/eta of them after each round, until `n_finalists` remain or the
+    subsample covers the whole training set.
+
+    A fixed validation slice of the training data is used for scoring, so the
+    caller's test split stays untouched. Returns the finalist names (best
+    first) and the budget each candidate consumed.
+    """
+    from sklearn.base import clone
+    from sklearn.model_selection import train_test_split
+
+    X_train = np.asarray(X_train)
+    y_train = np.asarray(y_train)
+    try:
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=HALVING_VALIDATION_SIZE, random_state=random_state,
+            stratify=y_train if stratify else None
+        )
+    except ValueError:
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=HALVING_VALIDATION_SIZE, random_state=random_state
+        )
+
+    budget = {name: {"rounds": 0, "samples_seen": 0, "fit_seconds": 0.0, "scores": []} for name in candidates}
+    if len(candidates) <= n_finalists:
+        return list(candidates), budget
+
+    survivors = list(candidates)
+    n_samples = min(min_samples, len(y_fit))
+    rung = 0
+
+    while True:
+        X_sub, y_sub = _subsample(X_fit, y_fit, n_samples, stratify, random_state + rung)
+        logging.info(f"🔍 Halving round {rung}: {len(survivors)} candidates on {len(y_sub)} rows")
+
+        fitted = fit_candidates(
+            {name: clone(candidates[name]) for name in survivors}, X_sub, y_sub, X_val, n_workers=n_workers
+        )
+        scores = {}
+        for name, result in fitted.items():
+            entry = budget[name]
+            entry["rounds"] += 1
+            entry["samples_seen"] += int(len(y_sub))
+            if "error" in result:
+                entry["error"] = result["error"]
+                scores[name] = -math.inf
+                continue
+            entry["fit_seconds"] = round(entry["fit_seconds"] + result["fit_time"], 3)
+            scores[name] = float(scorer(y_val, result["y_pred"]))
+            entry["scores"].append(round(scores[name], 4))
+
+        # Stable sort keeps declaration order on ties, so the selection is deterministic
+        ranked = sorted(survivors, key=lambda name: scores[name], reverse=True)
+        last_round = n_samples >= len(y_fit)
+        keep = n_finalists if last_round else max(n_finalists, math.ceil(len(ranked) / eta))
+        survivors = ranked[:keep]
+        for name in ranked[keep:]:
+            budget[name]["eliminated_in_round"] = rung
+        if last_round or len(survivors) <= n_finalists:
+            break
+        n_samples = min(n_samples * eta, len(y_fit))
+        rung += 1
+
+    logging.info(f"✅ Halving finalists: {survivors}")
+    return survivors, budget
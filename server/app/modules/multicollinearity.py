@@ -0,0 +1,80 @@
+# modules/multicollinearity.py
+
+import logging
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+VIF_THRESHOLD = 5.0
+# Condition number above which the correlation matrix is treated as singular
+SINGULAR_CONDITION = 1e12
+SINGULAR_RIDGE = 1e-8
+
+
+def _correlation(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Correlation matrix of the non-constant columns, plus their indices"""
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt((centered * centered).sum(axis=0))
+    varying = np.flatnonzero(norms > 0)
+    scaled = centered[:, varying] / norms[varying]
+    return scaled.T @ scaled, varying
+
+
+def _inverse(corr: np.ndarray) -> np.ndarray:
+    if np.linalg.cond(corr) < SINGULAR_CONDITION:
+        return np.linalg.inv(corr)
+    # Exact collinearity: a tiny ridge keeps R invertible and gives the dependent
+    # columns VIFs of order 1 / SINGULAR_RIDGE, so they are still the first to go
+    logging.warning("⚠️ Correlation matrix is singular; adding a small ridge for VIF")
+    return np.linalg.inv(corr + SINGULAR_RIDGE * np.eye(len(corr)))
+
+
+def vif_scores(X) -> pd.Series:
+    """
+    Every VIF at once as diag(R^-1), R being the correlation matrix:
+    one p x p inverse instead of one OLS fit per column. Constant columns get NaN
+    (as statsmodels' variance_inflation_factor does on standardised data).
+    """
+    columns = list(X.columns) if isinstance(X, pd.DataFrame) else list(range(np.shape(X)[1]))
+    values = np.asarray(X, dtype=np.float64)
+    corr, varying = _correlation(values)
+    scores = np.full(len(columns), np.nan)
+    if len(varying):
+        scores[varying] = np.diag(_inverse(corr))
+    return pd.Series(scores, index=columns, name="VIF")
+
+
+def drop_high_vif(X, threshold: float = VIF_THRESHOLD) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """
+    Iteratively remove the column with the highest VIF until every VIF is at
+    most `threshold`. After each removal the inverse is downdated in place
+    with the Schur complement
+        P' = P[-k, -k] - P[-k, k] P[k, -k] / P[k, k]
+    which is the inverse of the correlation matrix without column k, so the
+    matrix is inverted only once. Returns the dropped columns in order and
+    the VIF each had when it was removed.
+    """
+    columns = list(X.columns) if isinstance(X, pd.DataFrame) else list(range(np.shape(X)[1]))
+    corr, varying = _correlation(np.asarray(X, dtype=np.float64))
+    if not len(varying):
+        return [], []
+    inverse = _inverse(corr)
+    alive = list(varying)
+    dropped, steps = [], []
+
+    while len(alive) > 1:
+        vif = np.diag(inverse)
+        k = int(np.argmax(vif))
+        if vif[k] <= threshold:
+            break
+        col = columns[alive[k]]
+        dropped.append(col)
+        steps.append({"feature": col, "VIF": float(vif[k])})
+        pivot = inverse[:, k]
+        inverse = inverse - np.outer(pivot, pivot) / pivot[k]
+        inverse = np.delete(np.delete(inverse, k, axis=0), k, axis=1)
+        del alive[k]
+
+    logging.info(f"✅ VIF elimination dropped {len(dropped)} of {len(columns)} features")
+    return dropped, steps
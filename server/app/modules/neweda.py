@@ -3,31 +3,55 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.impute import KNNImputer
-from sklearn.feature_selection import chi2, f_classif
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.io as pio
 from typing import Dict, Any, Tuple, List
 import os
 import warnings
 import logging
 
+from app.modules.imputation import impute_frame, IMPUTATION_STRATEGIES, IMPUTATION_STRATEGY
+from app.modules.profiler import profile_frame
+from app.modules.streaming_stats import statistics_from_frame
+from app.modules.outliers import iqr_outlier_mask
+from app.modules.feature_screening import screen_features, screening_to_dict
+from app.modules.stage_graph import StageGraph, StageRef, StageOutput, frame_digest
+
 warnings.filterwarnings('ignore')
 
 
 class AutoEDAPipeline:
     """Enhanced Automated EDA Pipeline with advanced visualizations"""
 
-    def __init__(self):
+    def __init__(self, imputation_strategy: str = None):
         self.charts_dir = "static/charts"
         os.makedirs(self.charts_dir, exist_ok=True)
         self.knn_neighbors = 5
+        self.imputation_strategy = imputation_strategy or IMPUTATION_STRATEGY
+        if self.imputation_strategy not in IMPUTATION_STRATEGIES:
+            raise ValueError(f"Unknown imputation strategy '{self.imputation_strategy}'. "
+                             f"Choose from {IMPUTATION_STRATEGIES}")
+        self.imputation_info = {}
+        self.quality_profile = {}
+        self.outlier_info = {}
+        self.feature_screening = None
         self.iqr_factor = 1.5
 
-    def run_analysis(self, df: pd.DataFrame, task_type: str, target_col: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    def run_analysis(
+        self,
+        df: pd.DataFrame,
+        task_type: str,
+        target_col: str,
+        graph: StageGraph = None,
+        source: StageRef = None,
+        target: StageRef = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Run the EDA as a graph of cached stages (see modules/stage_graph.py).
+        `source` is the stage that produced `df` and `target` an optional stage
+        producing a prepared target Series. Stages that only depend on the data
+        (quality, clean) are shared between runs with a different target;
+        imputation onwards depends on the target because the features are the
+        columns other than it.
+        """
         report = {}
         logging.info("🔵 Starting EDA Pipeline...")
 
@@ -37,18 +61,24 @@ class AutoEDAPipeline:
         # Normalize target column name too
         target_col = target_col.strip().replace(' ', '_')
 
+        graph = graph or StageGraph()
+        source = source or graph.source("data", df, frame_digest(df))
+
         # Step 1: Data Quality Assessment
         try:
-            report["data_quality"] = self._assess_data_quality(df)
+            quality = graph.stage("quality", self._assess_data_quality, [source])
+            self.quality_profile = quality.value
+            report["data_quality"] = quality.value
             logging.info("✅ Data quality assessment completed.")
         except Exception as e:
             logging.error(f"❌ Data quality assessment failed: {e}")
+            quality = graph.source("quality", {}, digest="empty")
             report["data_quality"] = {}
 
         # Step 2: Clean column names and remove unnecessary columns
         try:
-            cleaned_df = self._clean_data(df, target_col)
-            report["cleaned_shape"] = cleaned_df.shape
+            clean = graph.stage("clean", self._clean_data, [source, quality])
+            report["cleaned_shape"] = clean.summary["shape"]
             logging.info("✅ Data cleaning completed.")
         except Exception as e:
             logging.error(f"❌ Data cleaning failed: {e}")
@@ -56,7 +86,10 @@ class AutoEDAPipeline:
 
         # Step 3: Feature Engineering
         try:
-            engineered_df = self._engineer_features(cleaned_df, target_col, task_type)
+            engineered, screening = self._engineer_features(graph, clean, target, target_col, task_type)
+            engineered_df = engineered.value
+            report["imputation"] = self.imputation_info
+            report["outliers"] = self.outlier_info
             logging.info("✅ Feature engineering completed.")
         except Exception as e:
             logging.error(f"❌ Feature engineering failed: {e}")
@@ -64,7 +97,9 @@ class AutoEDAPipeline:
 
         # Step 4: Statistical Analysis
         try:
-            report["statistics"] = self._statistical_analysis(engineered_df, target_col, task_type)
+            statistics = graph.stage("statistics", self._statistical_analysis, [engineered],
+                                     {"target_col": target_col, "task_type": task_type})
+            report["statistics"] = statistics.value
             logging.info("✅ Statistical analysis completed.")
         except Exception as e:
             logging.error(f"❌ Statistical analysis failed: {e}")
@@ -72,48 +107,30 @@ class AutoEDAPipeline:
 
         # Step 5: Feature Importance
         try:
-            report["feature_importance"] = self._analyze_feature_importance(engineered_df, target_col, task_type)
+            importance = graph.stage("importance", self._analyze_feature_importance, [engineered, screening],
+                                     {"target_col": target_col, "task_type": task_type})
+            report["feature_importance"] = importance.value
             logging.info("✅ Feature importance analysis completed.")
         except Exception as e:
             logging.error(f"❌ Feature importance failed: {e}")
             report["feature_importance"] = {}
 
-        logging.info("🟢 EDA Pipeline successfully completed.")
+        report["stage_graph"] = graph.report()
+        logging.info(f"🟢 EDA Pipeline successfully completed "
+                     f"({report['stage_graph']['cache_hits']} stages from cache).")
         return engineered_df, report
 
     def _assess_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
         logging.info("Assessing data quality...")
         try:
-            quality_report = {
-                "shape": df.shape,
-                "memory_usage": df.memory_usage(deep=True).sum(),
-                "dtypes": df.dtypes.value_counts().to_dict(),
-                "missing_values": df.isnull().sum().to_dict(),
-                "missing_percentage": (df.isnull().sum() / len(df) * 100).round(2).to_dict(),
-                "duplicate_rows": df.duplicated().sum(),
-                "unique_values": {col: df[col].nunique() for col in df.columns},
-                "zero_values": (df == 0).sum().to_dict(),
-                "negative_values": (df.select_dtypes(include=[np.number]) < 0).sum().to_dict()
-            }
-
-            # Identify potential issues
-            issues = []
-            for col in df.columns:
-                if quality_report["missing_percentage"][col] > 50:
-                    issues.append(f"High missing values in {col}: {quality_report['missing_percentage'][col]:.1f}%")
-
-                if df[col].dtype == 'object' and df[col].nunique() == len(df):
-                    issues.append(f"Potential ID column: {col}")
-
-            quality_report["potential_issues"] = issues
-
-            return quality_report
+            # Single columnar pass; see modules/profiler.py
+            return profile_frame(df)
         except Exception as e:
             logging.error(f"Data quality assessment failed: {e}")
             return {}
 
-    def _clean_data(self, df: pd.DataFrame, target_col: str) -> pd.DataFrame:
-        """Enhanced data cleaning with logging"""
+    def _clean_data(self, df: pd.DataFrame, quality_profile: Dict[str, Any] = None) -> StageOutput:
+        """Enhanced data cleaning with logging (target-independent; ID-like columns are dropped in _split_target)"""
 
         logging.info("Starting data cleaning...")
         cleaned_df = df.copy()
@@ -122,55 +139,73 @@ class AutoEDAPipeline:
         cleaned_df.columns = cleaned_df.columns.str.strip().str.replace(' ', '_', regex=False)
         logging.info(f"Column names cleaned. Total columns: {len(cleaned_df.columns)}")
 
-        # Remove ID-like columns but never remove target column
-        id_cols = [col for col in cleaned_df.columns
-                   if any(keyword in col.lower() for keyword in ['id', 'index', 'key']) and col != target_col]
-        cleaned_df = cleaned_df.drop(columns=id_cols, errors='ignore')
-        logging.info(f"Removed ID-like columns (except target): {id_cols}")
-
-        # Remove high-null columns (>60% missing)
-        high_null_cols = cleaned_df.columns[cleaned_df.isnull().mean() > 0.6].tolist()
+        # Remove high-null columns (>60% missing), reusing the quality profile when it covers these columns
+        missing_pct = (quality_profile or {}).get("missing_percentage", {})
+        if all(col in missing_pct for col in cleaned_df.columns):
+            high_null_cols = [col for col in cleaned_df.columns if missing_pct[col] > 60]
+        else:
+            high_null_cols = cleaned_df.columns[cleaned_df.isnull().mean() > 0.6].tolist()
         cleaned_df = cleaned_df.drop(columns=high_null_cols)
         logging.info(f"Removed high-null columns: {high_null_cols}")
 
         # Convert string numbers to numeric where possible
-        for col in cleaned_df.select_dtypes(include=['object']).columns:
+        for col in cleaned_df.select_dtypes(include=['object', 'category']).columns:
             numeric_series = pd.to_numeric(cleaned_df[col], errors='coerce')
             if numeric_series.notna().mean() > 0.7:
                 cleaned_df[col] = numeric_series
                 logging.info(f"Converted column '{col}' to numeric")
 
         logging.info(f"Data cleaning completed. Remaining columns: {len(cleaned_df.columns)}")
-        return cleaned_df
+        return StageOutput(cleaned_df, {"shape": cleaned_df.shape})
 
-    def _engineer_features(self, df: pd.DataFrame, target_col: str, task_type: str) -> pd.DataFrame:
-        """Advanced feature engineering with logging and error handling"""
+    def _split_target(self, df: pd.DataFrame, target: pd.Series = None,
+                      target_col: str = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """Separate the target from the features, dropping ID-like columns but never the target"""
 
-        logging.info("🔵 Starting feature engineering...")
+        if target_col not in df.columns:
+            raise ValueError(f"Target column '{target_col}' not found")
+        logging.info(f"Target column '{target_col}' found.")
 
-        try:
-            if target_col not in df.columns:
-                raise ValueError(f"Target column '{target_col}' not found")
-            logging.info(f"Target column '{target_col}' found.")
+        id_cols = [col for col in df.columns
+                   if any(keyword in col.lower() for keyword in ['id', 'index', 'key']) and col != target_col]
+        logging.info(f"Removed ID-like columns (except target): {id_cols}")
 
-            engineered_df = df.copy()
+        y = df[target_col]
+        if target is not None:
+            # A prepared target replaces the cleaned column, with the same numeric conversion _clean_data applies
+            y = pd.Series(target.to_numpy(), index=df.index, name=target_col)
+            if y.dtype == 'object':
+                numeric_series = pd.to_numeric(y, errors='coerce')
+                if numeric_series.notna().mean() > 0.7:
+                    y = numeric_series
+        X = df.drop(columns=id_cols + [target_col])
+        logging.info("✅ Target separated from features.")
+        return X, y
+
+    def _engineer_features(self, graph: StageGraph, clean: StageRef, target: StageRef, target_col: str,
+                           task_type: str) -> Tuple[StageRef, StageRef]:
+        """Advanced feature engineering as cached stages; returns the engineered frame and the screening table"""
 
-            # Separate features and target
-            y = engineered_df[target_col]
-            X = engineered_df.drop(columns=[target_col])
-            logging.info("✅ Target separated from features.")
+        logging.info("🔵 Starting feature engineering...")
+
+        try:
+            split = graph.stage("split", self._split_target, [clean] + ([target] if target else []),
+                                {"target_col": target_col})
 
-            # Step 1: KNN Imputation
+            # Step 1: Imputation
             try:
-                X_imputed = self._knn_impute(X)
-                logging.info("✅ KNN imputation completed.")
+                imputed = graph.stage("impute", self._impute, [split], {
+                    "strategy": self.imputation_strategy, "n_neighbors": self.knn_neighbors
+                })
+                self.imputation_info = imputed.summary
+                logging.info("✅ Imputation completed.")
             except Exception as e:
-                logging.error(f"❌ KNN imputation failed: {e}")
+                logging.error(f"❌ Imputation failed: {e}")
                 raise
 
             # Step 2: Categorical Encoding
             try:
-                X_encoded = self._encode_categorical(X_imputed)
+                encoded = graph.stage("encode", self._encode_categorical, [imputed])
                 logging.info("✅ Categorical encoding completed.")
             except Exception as e:
                 logging.error(f"❌ Encoding failed: {e}")
@@ -178,89 +213,70 @@ class AutoEDAPipeline:
 
             # Step 3: Scaling
             try:
-                X_scaled = self._scale_features(X_encoded)
+                scaled = graph.stage("scale", self._scale_features, [encoded])
                 logging.info("✅ Feature scaling completed.")
             except Exception as e:
                 logging.error(f"❌ Scaling failed: {e}")
                 raise
 
             # Step 4: Target Encoding (classification only)
-            if task_type == "classification" and y.dtype == 'object':
-                try:
-                    y_encoded = LabelEncoder().fit_transform(y)
-                    y = pd.Series(y_encoded, index=y.index, name=target_col)
-                    logging.info("✅ Target encoding (classification) completed.")
-                except Exception as e:
-                    logging.error(f"❌ Target encoding failed: {e}")
-                    raise
+            try:
+                target = graph.stage("target_encode", self._encode_target, [split], {"task_type": task_type})
+                logging.info("✅ Target encoding completed.")
+            except Exception as e:
+                logging.error(f"❌ Target encoding failed: {e}")
+                raise
 
-            # Step 5: Outlier Removal
+            # Step 5: Feature Screening on the encoded, unscaled features (reused by feature importance)
+            screening = graph.stage("screening", self._screen_features, [encoded, target], {"task_type": task_type})
+            self.feature_screening = screening.value
+            logging.info("✅ Feature screening completed.")
+
+            # Step 6: Outlier Removal
             try:
-                X_clean, y_clean = self._remove_outliers(X_scaled, y)
+                engineered = graph.stage("outliers", self._remove_outliers, [scaled, target],
+                                         {"iqr_factor": self.iqr_factor})
+                self.outlier_info = engineered.summary
                 logging.info("✅ Outlier removal completed.")
             except Exception as e:
                 logging.error(f"❌ Outlier removal failed: {e}")
                 raise
 
-            final_df = pd.concat([X_clean, y_clean], axis=1)
             logging.info("🟢 Feature engineering fully completed.")
-            return final_df.dropna()
+            return engineered, screening
 
         except Exception as e:
             logging.error(f"❌ Full feature engineering failed: {e}")
             raise
 
-    def _knn_impute(self, df: pd.DataFrame) -> pd.DataFrame:
-        """KNN imputation for missing values with logging and error handling"""
+    def _impute(self, split: Tuple[pd.DataFrame, pd.Series], strategy: str, n_neighbors: int) -> StageOutput:
+        """Missing value imputation of the features (see modules/imputation.py)"""
 
-        logging.info("🔵 Starting KNN imputation...")
+        logging.info(f"🔵 Starting imputation (strategy: {strategy})...")
 
         try:
-            cat_cols = df.select_dtypes(include=['object']).columns.tolist()
-            df_temp = df.copy()
-
-            encoders = {}
-
-            # Step 1: Encoding categorical columns before imputation
-            try:
-                for col in cat_cols:
-                    encoder = LabelEncoder()
-                    df_temp[col] = encoder.fit_transform(df_temp[col].astype(str))
-                    encoders[col] = encoder
-                logging.info(f"✅ Encoded categorical columns for KNN imputation: {cat_cols}")
-            except Exception as e:
-                logging.error(f"❌ Encoding before KNN imputation failed: {e}")
-                raise
+            df_imputed, info = impute_frame(split[0], strategy=strategy, n_neighbors=n_neighbors)
+            logging.info("🟢 Imputation fully completed.")
+            return StageOutput(df_imputed, info)
 
-            # Step 2: Apply KNN imputation
-            try:
-                imputer = KNNImputer(n_neighbors=self.knn_neighbors)
-                df_imputed = pd.DataFrame(
-                    imputer.fit_transform(df_temp),
-                    columns=df_temp.columns,
-                    index=df_temp.index
-                )
-                logging.info("✅ KNN imputation completed.")
-            except Exception as e:
-                logging.error(f"❌ KNN imputation failed: {e}")
-                raise
+        except Exception as e:
+            logging.error(f"❌ Full imputation failed: {e}")
+            raise
 
-            # Step 3: Decode categorical columns back to original labels
-            try:
-                for col in cat_cols:
-                    df_imputed[col] = df_imputed[col].round().astype(int)
-                    df_imputed[col] = encoders[col].inverse_transform(df_imputed[col])
-                logging.info(f"✅ Decoded categorical columns back to original labels: {cat_cols}")
-            except Exception as e:
-                logging.error(f"❌ Decoding categorical columns after KNN failed: {e}")
-                raise
+    def _encode_target(self, split: Tuple[pd.DataFrame, pd.Series], task_type: str) -> pd.Series:
+        """Label-encode a string target for classification; other targets pass through"""
 
-            logging.info("🟢 KNN imputation fully completed.")
-            return df_imputed
+        y = split[1]
+        if task_type == "classification" and y.dtype == 'object':
+            y = pd.Series(LabelEncoder().fit_transform(y), index=y.index, name=y.name)
+        return y
 
+    def _screen_features(self, X: pd.DataFrame, y: pd.Series, task_type: str):
+        try:
+            return screen_features(X, y, task_type)
         except Exception as e:
-            logging.error(f"❌ Full KNN imputation failed: {e}")
-            raise
+            logging.error(f"❌ Feature screening failed: {e}")
+            return None
 
     def _encode_categorical(self, df: pd.DataFrame) -> pd.DataFrame:
         """Enhanced categorical encoding with logging and error handling"""
@@ -270,7 +286,7 @@ class AutoEDAPipeline:
         try:
             encoded_df = df.copy()
 
-            cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+            cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
             logging.info(f"Found categorical columns: {cat_cols}")
 
             for col in cat_cols:
@@ -315,29 +331,24 @@ class AutoEDAPipeline:
             logging.error(f"❌ Feature scaling failed: {e}")
             raise
 
-    def _remove_outliers(self, X: pd.DataFrame, y: pd.Series) -> Tuple[pd.DataFrame, pd.Series]:
-        """IQR-based outlier removal with logging and error handling"""
+    def _remove_outliers(self, X: pd.DataFrame, y: pd.Series, iqr_factor: float = 1.5) -> StageOutput:
+        """IQR-based outlier removal with logging and error handling; the value is the engineered frame"""
 
         logging.info("🔵 Starting outlier removal...")
 
         try:
-            Q1 = X.quantile(0.25)
-            Q3 = X.quantile(0.75)
-            IQR = Q3 - Q1
-
-            lower_bound = Q1 - self.iqr_factor * IQR
-            upper_bound = Q3 + self.iqr_factor * IQR
-
-            outlier_mask = ~((X < lower_bound) | (X > upper_bound)).any(axis=1)
+            keep_mask, info = iqr_outlier_mask(X, factor=iqr_factor)
 
-            outliers_removed = (~outlier_mask).sum()
+            outliers_removed = info["rows_removed"]
             logging.info(f"✅ Outlier removal completed. Total rows removed: {outliers_removed}")
 
-            return X[outlier_mask], y[outlier_mask]
+            X, y = X[keep_mask], y[keep_mask]
 
         except Exception as e:
             logging.error(f"❌ Outlier removal failed: {e}")
-            return X, y  # fail-safe return original data
+            info = {}  # fail-safe: keep original data
+
+        return StageOutput(pd.concat([X, y], axis=1).dropna(), info)
 
     async def _generate_visualizations(self, df: pd.DataFrame, target_col: str, task_type: str) -> Dict[str, str]:
         """Generate comprehensive visualizations with logging and error handling"""
@@ -565,34 +576,8 @@ class AutoEDAPipeline:
         logging.info("🔵 Starting statistical analysis...")
 
         try:
-            stats = {}
-
-            # Basic statistics
-            stats["descriptive"] = df.describe().to_dict()
-            logging.info("✅ Descriptive statistics generated.")
-
-            if target_col in df.columns:
-                target = df[target_col]
-
-                if task_type == "classification":
-                    stats["target"] = {
-                        "unique_classes": int(target.nunique()),
-                        "class_distribution": target.value_counts().to_dict(),
-                        "class_balance": target.value_counts(normalize=True).to_dict()
-                    }
-                    logging.info("✅ Target analysis (classification) generated.")
-                else:
-                    stats["target"] = {
-                        "mean": float(target.mean()),
-                        "median": float(target.median()),
-                        "std": float(target.std()),
-                        "skewness": float(target.skew()),
-                        "kurtosis": float(target.kurtosis())
-                    }
-                    logging.info("✅ Target analysis (regression) generated.")
-            else:
-                logging.warning(f"⚠️ Target column '{target_col}' not found in dataset.")
-
+            # Chunked, mergeable accumulators; see modules/streaming_stats.py
+            stats = statistics_from_frame(df, target_col, task_type)
             logging.info("🟢 Statistical analysis fully completed.")
             return stats
 
@@ -600,7 +585,8 @@ class AutoEDAPipeline:
             logging.error(f"❌ Statistical analysis failed: {e}")
             return {}
 
-    def _analyze_feature_importance(self, df: pd.DataFrame, target_col: str, task_type: str) -> Dict[str, Any]:
+    def _analyze_feature_importance(self, df: pd.DataFrame, table: pd.DataFrame, target_col: str,
+                                    task_type: str) -> Dict[str, Any]:
         """Analyze feature importance using statistical tests with logging and error handling"""
 
         logging.info("🔵 Starting feature importance analysis...")
@@ -610,24 +596,10 @@ class AutoEDAPipeline:
                 logging.warning(f"⚠️ Target column '{target_col}' not found for feature importance.")
                 return {}
 
-            X = df.drop(columns=[target_col])
-            y = df[target_col]
-
-            importance_scores = {}
-
-            if task_type == "classification":
-                scores, p_values = chi2(X, y)
-                logging.info("✅ Chi-Square test applied for classification task.")
-            else:
-                scores, p_values = f_classif(X, y)
-                logging.info("✅ F-test applied for regression task.")
-
-            for i, col in enumerate(X.columns):
-                importance_scores[col] = {
-                    "score": float(scores[i]),
-                    "p_value": float(p_values[i]),
-                    "significant": p_values[i] < 0.05
-                }
+            # Computed once in _engineer_features; recompute only when this df was not engineered here
+            if table is None or not set(table.index) >= set(df.columns.drop(target_col)):
+                table = screen_features(df.drop(columns=[target_col]), df[target_col], task_type)
+            importance_scores = screening_to_dict(table[table.index.isin(df.columns)])
 
             logging.info("🟢 Feature importance analysis completed.")
             return importance_scores
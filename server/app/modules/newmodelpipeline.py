@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
+import time
 from typing import Dict, Any, Tuple
 from datetime import datetime
 import matplotlib.pyplot as plt
@@ -29,6 +30,14 @@ from imblearn.under_sampling import RandomUnderSampler
 from xgboost import XGBClassifier, XGBRegressor
 import lightgbm as lgb
 import warnings
+from app.modules.model_selection import successive_halving, MODEL_SELECTION_MODE
+from app.modules.ensembles import (
+    PrefitVotingEnsemble, PrefitStackingEnsemble, class_scores, average_outputs, stack_features, ENSEMBLE_MODES
+)
+from app.modules.search_engine import (
+    HyperparameterSearch, SearchBudget, FoldCache,
+    SEARCH_STRATEGY, SEARCH_MAX_FITS, SEARCH_MAX_SECONDS
+)
 
 warnings.filterwarnings('ignore')
 
@@ -36,7 +45,18 @@ warnings.filterwarnings('ignore')
 class EnhancedMLPipeline:
     """Enhanced ML pipeline with advanced algorithms and hyperparameter tuning"""
 
-    def __init__(self):
+    def __init__(self, selection_mode: str = None, search_strategy: str = None,
+                 max_fits: int = None, max_seconds: float = None, ensemble_mode: str = "averaging"):
+        if ensemble_mode not in ENSEMBLE_MODES:
+            raise ValueError(f"Unknown ensemble mode '{ensemble_mode}'. Choose from {ENSEMBLE_MODES}")
+        self.ensemble_mode = ensemble_mode
+        self.selection_mode = selection_mode or MODEL_SELECTION_MODE
+        self.selection_budget = None
+        self.search_strategy = search_strategy or SEARCH_STRATEGY
+        self.max_fits = max_fits or SEARCH_MAX_FITS
+        self.max_seconds = max_seconds or SEARCH_MAX_SECONDS
+        self.search_budget = None
+        self.search_trace = []
         print("[INFO] Initializing directories...")
         self.charts_dir = "../ML/static/charts"
         self.models_dir = "../ML/outputs"
@@ -241,33 +261,47 @@ class EnhancedMLPipeline:
         models_config = self.classification_models if task_type == "classification" else self.regression_models
         results = {}
 
+        if self.selection_mode == "halving":
+            # Shortlist on subsamples with default params; only finalists get the full tuning
+            print("Running successive halving to shortlist models...")
+            scorer = (lambda y_true, y_pred: f1_score(y_true, y_pred, average='macro')) \
+                if task_type == "classification" else r2_score
+            finalists, self.selection_budget = successive_halving(
+                {name: config["model"] for name, config in models_config.items()},
+                X_train, y_train, scorer, stratify=task_type == "classification"
+            )
+            models_config = {name: models_config[name] for name in finalists}
+
+        # One budget and one set of CV splits shared by every model's search
+        scorer = (lambda y_true, y_pred: f1_score(y_true, y_pred, average='macro')) \
+            if task_type == "classification" else r2_score
+        self.search_budget = SearchBudget(self.max_fits, self.max_seconds)
+        search = HyperparameterSearch(scorer, strategy=self.search_strategy, budget=self.search_budget)
+        folds = FoldCache(X_train, y_train, task_type)
+        self.search_trace = search.trace
+
         for name, config in models_config.items():
             try:
                 print(f"Training {name}...")
+                start_time = time.perf_counter()
 
-                # Hyperparameter tuning if parameters are defined
-                if config["params"]:
-                    grid_search = GridSearchCV(
-                        config["model"],
-                        config["params"],
-                        cv=3,
-                        scoring='f1_macro' if task_type == "classification" else 'r2',
-                        n_jobs=-1
-                    )
-                    grid_search.fit(X_train, y_train)
-                    best_model = grid_search.best_estimator_
-                    best_params = grid_search.best_params_
-                else:
-                    best_model = config["model"]
-                    best_model.fit(X_train, y_train)
-                    best_params = {}
+                # Hyperparameter tuning within the shared search budget
+                searched = search.search(name, config["model"], config["params"], X_train, y_train, folds)
+                best_model = searched["model"]
+                best_params = searched["best_params"]
 
-                # Make predictions
+                if self.selection_budget is not None:
+                    self.selection_budget[name]["samples_seen"] += int(len(y_train))
+                    self.selection_budget[name]["full_fit_seconds"] = round(time.perf_counter() - start_time, 3)
+
+                # Make predictions (cached so the ensemble never has to call the models again)
                 y_pred = best_model.predict(X_test)
+                y_prob = None
 
                 # Calculate metrics
                 if task_type == "classification":
-                    metrics = self._calculate_classification_metrics(y_test, y_pred, best_model, X_test)
+                    y_prob = class_scores(best_model, X_test, np.unique(y_train))
+                    metrics = self._calculate_classification_metrics(y_test, y_pred, best_model, X_test, y_prob)
                 else:
                     metrics = self._calculate_regression_metrics(y_test, y_pred)
 
@@ -278,7 +312,12 @@ class EnhancedMLPipeline:
                     "model": best_model,
                     "metrics": metrics,
                     "best_params": best_params,
-                    "plot_path": plot_path
+                    "cv_score": searched["cv_score"],
+                    "plot_path": plot_path,
+                    "test_pred": y_pred,
+                    "test_proba": y_prob,
+                    "oof_pred": searched["oof_pred"],
+                    "oof_proba": searched["oof_proba"]
                 }
 
             except Exception as e:
@@ -287,7 +326,7 @@ class EnhancedMLPipeline:
 
         return results
 
-    def _calculate_classification_metrics(self, y_true, y_pred, model, X_test) -> Dict[str, float]:
+    def _calculate_classification_metrics(self, y_true, y_pred, model, X_test, y_prob=None) -> Dict[str, float]:
         """Calculate comprehensive classification metrics"""
         metrics = {
             "accuracy": accuracy_score(y_true, y_pred),
@@ -300,7 +339,7 @@ class EnhancedMLPipeline:
         # Add ROC AUC for binary classification
         if len(np.unique(y_true)) == 2:
             try:
-                y_prob = model.predict_proba(X_test)[:, 1]
+                y_prob = y_prob[:, 1] if y_prob is not None else model.predict_proba(X_test)[:, 1]
                 metrics["roc_auc"] = roc_auc_score(y_true, y_prob)
             except:
                 pass
@@ -376,25 +415,65 @@ class EnhancedMLPipeline:
                                 if "model" in data and "metrics" in data]
                 valid_models.sort(key=lambda x: x[1]["metrics"]["r2_score"], reverse=True)
 
+            mode = self.ensemble_mode
+            if mode == "stacking":
+                oof_key = "oof_proba" if task_type == "classification" else "oof_pred"
+                stackable = [(name, data) for name, data in valid_models if data.get(oof_key) is not None]
+                if len(stackable) >= 2:
+                    valid_models = stackable
+                else:
+                    print("Not enough models with out-of-fold predictions; falling back to averaging")
+                    mode = "averaging"
+
             if len(valid_models) < 2:
                 return {}
 
             # Create ensemble
             top_models = valid_models[:3]
             estimators = [(name, data["model"]) for name, data in top_models]
+            classes = np.unique(y_train) if task_type == "classification" else None
+            y_prob_ensemble = None
 
-            if task_type == "classification":
-                ensemble = VotingClassifier(estimators=estimators, voting='soft')
-            else:
-                ensemble = VotingRegressor(estimators=estimators)
+            if mode == "refit":
+                if task_type == "classification":
+                    ensemble = VotingClassifier(estimators=estimators, voting='soft')
+                else:
+                    ensemble = VotingRegressor(estimators=estimators)
 
-            # Train ensemble
-            ensemble.fit(X_train, y_train)
-            y_pred_ensemble = ensemble.predict(X_test)
+                # Train ensemble
+                ensemble.fit(X_train, y_train)
+                y_pred_ensemble = ensemble.predict(X_test)
+
+            elif mode == "averaging":
+                # Average the cached test outputs of the already fitted models
+                ensemble = PrefitVotingEnsemble(estimators, task_type, classes)
+                if task_type == "classification":
+                    y_prob_ensemble = average_outputs([data["test_proba"] for _, data in top_models])
+                    y_pred_ensemble = classes[np.argmax(y_prob_ensemble, axis=1)]
+                else:
+                    y_pred_ensemble = average_outputs([data["test_pred"] for _, data in top_models])
+
+            else:
+                # Stacking: meta-learner on the out-of-fold outputs collected during the search CV
+                if task_type == "classification":
+                    meta_model = LogisticRegression(max_iter=1000)
+                    train_features = stack_features([data["oof_proba"] for _, data in top_models])
+                    test_features = stack_features([data["test_proba"] for _, data in top_models])
+                else:
+                    meta_model = Ridge(alpha=1.0)
+                    train_features = stack_features([data["oof_pred"] for _, data in top_models])
+                    test_features = stack_features([data["test_pred"] for _, data in top_models])
+                meta_model.fit(train_features, y_train)
+                ensemble = PrefitStackingEnsemble(estimators, meta_model, task_type, classes)
+                y_pred_ensemble = meta_model.predict(test_features)
+                if task_type == "classification":
+                    y_prob_ensemble = meta_model.predict_proba(test_features)
 
             # Calculate metrics
             if task_type == "classification":
-                metrics = self._calculate_classification_metrics(y_test, y_pred_ensemble, ensemble, X_test)
+                metrics = self._calculate_classification_metrics(
+                    y_test, y_pred_ensemble, ensemble, X_test, y_prob_ensemble
+                )
             else:
                 metrics = self._calculate_regression_metrics(y_test, y_pred_ensemble)
 
@@ -406,7 +485,8 @@ class EnhancedMLPipeline:
                     "model": ensemble,
                     "metrics": metrics,
                     "plot_path": plot_path,
-                    "component_models": [name for name, _ in top_models]
+                    "component_models": [name for name, _ in top_models],
+                    "ensemble_mode": mode
                 }
             }
 
@@ -466,6 +546,10 @@ class EnhancedMLPipeline:
             },
             "comparison_table": comparison_table,
             "feature_importance": feature_importance,
+            "selection_mode": self.selection_mode,
+            "selection_budget": self.selection_budget,
+            "search": {"strategy": self.search_strategy, **(self.search_budget.summary() if self.search_budget else {})},
+            "search_trace": self.search_trace,
             "total_models_trained": len([r for r in results.values() if "metrics" in r]),
             "training_summary": {
                 "successful_models": len([r for r in results.values() if "metrics" in r]),
@@ -0,0 +1,108 @@
+# modules/outliers.py
+
+import logging
+from typing import Dict, Any, Tuple, Sequence
+
+import numpy as np
+import pandas as pd
+
+IQR_FACTOR = 1.5
+# Alternative factors reported alongside the applied one, to tune iqr_factor without rerunning
+IQR_TUNING_FACTORS = (1.0, 1.5, 2.0, 3.0)
+# Rows scored per block, bounding the temporary (rows x columns) arrays
+OUTLIER_BLOCK_ROWS = 65536
+
+
+def column_quartiles(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Q1 and Q3 of every column with linear interpolation (as pandas.quantile),
+    using np.partition instead of a full sort. NaNs are ignored.
+    """
+    n_rows, n_cols = block.shape
+    q1 = np.full(n_cols, np.nan, dtype=block.dtype)
+    q3 = np.full(n_cols, np.nan, dtype=block.dtype)
+
+    def _interpolate(part, n, q):
+        pos = (n - 1) * q
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, n - 1)
+        return part[lo] + (part[hi] - part[lo]) * (pos - lo)
+
+    def _kth(n):
+        return sorted({int(np.floor((n - 1) * q)) + step for q in (0.25, 0.75) for step in (0, 1)
+                       if int(np.floor((n - 1) * q)) + step < n})
+
+    nan_cols = np.isnan(block).any(axis=0)
+    if n_rows and not nan_cols.all():
+        # Columns without NaNs share the same ranks, so they are partitioned together
+        dense = np.flatnonzero(~nan_cols)
+        part = np.partition(block[:, dense], _kth(n_rows), axis=0)
+        q1[dense] = _interpolate(part, n_rows, 0.25)
+        q3[dense] = _interpolate(part, n_rows, 0.75)
+
+    for j in np.flatnonzero(nan_cols):
+        values = block[:, j]
+        values = values[~np.isnan(values)]
+        if len(values):
+            part = np.partition(values, _kth(len(values)))
+            q1[j] = _interpolate(part, len(values), 0.25)
+            q3[j] = _interpolate(part, len(values), 0.75)
+    return q1, q3
+
+
+def iqr_outlier_mask(
+    X,
+    factor: float = IQR_FACTOR,
+    tuning_factors: Sequence[float] = IQR_TUNING_FACTORS
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Boolean mask of the rows to keep: rows where no column falls outside
+    [Q1 - factor * IQR, Q3 + factor * IQR].
+
+    Each value gets an IQR-excess score max(Q1 - x, x - Q3) / IQR in one
+    vectorised pass over a contiguous float32 block; a row is an outlier when
+    its largest score exceeds `factor`. The same scores give the per-column
+    counts and the rows that would be removed at each of `tuning_factors`.
+    """
+    columns = list(X.columns) if isinstance(X, pd.DataFrame) else list(range(np.shape(X)[1]))
+    block = np.asarray(X, dtype=np.float32, order="F") if not isinstance(X, pd.DataFrame) \
+        else np.asfortranarray(X.to_numpy(dtype=np.float32, na_value=np.nan))
+    q1, q3 = column_quartiles(block)
+    iqr = q3 - q1
+
+    n_rows = block.shape[0]
+    row_scores = np.empty(n_rows, dtype=np.float32)
+    flagged = np.zeros(len(columns), dtype=np.int64)
+    only_flag = np.zeros(len(columns), dtype=np.int64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for start in range(0, n_rows, OUTLIER_BLOCK_ROWS):
+            chunk = block[start:start + OUTLIER_BLOCK_ROWS]
+            scores = np.maximum(q1 - chunk, chunk - q3) / iqr
+            # NaN cells and in-range values of zero-IQR columns (0/0) never flag a row
+            scores[np.isnan(scores)] = -np.inf
+            outside = scores > factor
+            flagged += outside.sum(axis=0)
+            single = outside.sum(axis=1) == 1
+            only_flag += np.bincount(np.argmax(outside[single], axis=1), minlength=len(columns)) \
+                if single.any() else 0
+            row_scores[start:start + OUTLIER_BLOCK_ROWS] = scores.max(axis=1) if len(columns) else -np.inf
+
+    keep = ~(row_scores > factor)
+    removed = int(n_rows - keep.sum())
+    summary = {
+        "iqr_factor": factor,
+        "rows_removed": removed,
+        "rows_removed_by_factor": {str(f): int((row_scores > f).sum()) for f in tuning_factors},
+        "columns": {
+            str(col): {
+                "q1": float(q1[j]),
+                "q3": float(q3[j]),
+                "rows_flagged": int(flagged[j]),
+                "rows_flagged_only_here": int(only_flag[j])
+            }
+            for j, col in enumerate(columns)
+        }
+    }
+    logging.info(f"✅ IQR outlier scan: {removed} of {n_rows} rows outside {factor} x IQR")
+    return keep, summary
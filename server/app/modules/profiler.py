@@ -0,0 +1,175 @@
+# modules/profiler.py
+
+import os
+import logging
+from typing import Dict, Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns switch from an exact distinct-hash set to HyperLogLog above this many distinct values
+EXACT_CARDINALITY_LIMIT = int(os.getenv("EXACT_CARDINALITY_LIMIT", "1000000"))
+HLL_PRECISION = 14  # 2**14 registers, ~0.8% standard error
+PROFILE_CHUNK_ROWS = int(os.getenv("PROFILE_CHUNK_ROWS", "250000"))
+HIGH_MISSING_PERCENT = 50
+
+
+class HyperLogLog:
+    """Vectorised HyperLogLog over pre-computed 64-bit hashes"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64-p bits
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        bit_length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * np.log(self.m / zeros)  # linear counting for small ranges
+        return int(round(estimate))
+
+
+class _ColumnProfile:
+    __slots__ = ("dtype", "nulls", "zeros", "negatives", "hashes", "hll")
+
+    def __init__(self):
+        self.dtype = None
+        self.nulls = 0
+        self.zeros = 0
+        self.negatives = 0
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.hll: Optional[HyperLogLog] = None
+
+    def add_distinct(self, hashes: np.ndarray) -> None:
+        if self.hll is not None:
+            self.hll.add_hashes(hashes)
+            return
+        self.hashes = np.union1d(self.hashes, hashes)
+        if len(self.hashes) > EXACT_CARDINALITY_LIMIT:
+            self.hll = HyperLogLog()
+            self.hll.add_hashes(self.hashes)
+            self.hashes = np.empty(0, dtype=np.uint64)
+
+    @property
+    def cardinality(self) -> int:
+        return self.hll.count() if self.hll is not None else len(self.hashes)
+
+
+class DataProfiler:
+    """
+    Single-pass data-quality profiler. Feed it one DataFrame or a sequence of
+    chunks through update(); every per-column statistic is computed once per
+    chunk and shared by all checks in report().
+
+    Duplicate rows are detected from 64-bit row hashes, and distinct counts
+    fall back to HyperLogLog once a column exceeds EXACT_CARDINALITY_LIMIT.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.memory_usage = 0
+        self.duplicate_rows = 0
+        self.columns: Dict[str, _ColumnProfile] = {}
+        self._row_hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, chunk: pd.DataFrame) -> "DataProfiler":
+        self.rows += len(chunk)
+        self.memory_usage += int(chunk.memory_usage(deep=True).sum())
+
+        row_hashes = np.zeros(len(chunk), dtype=np.uint64)
+
+        for col in chunk.columns:
+            series = chunk[col]
+            profile = self.columns.setdefault(col, _ColumnProfile())
+            profile.dtype = series.dtype
+            isna = series.isna().to_numpy()
+            profile.nulls += int(isna.sum())
+
+            kind = series.dtype.kind
+            if kind in "iuf":
+                # int and float chunks of the same column must hash alike
+                # (+ 0.0 folds -0.0 into 0.0, which nunique treats as equal)
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0
+                profile.zeros += int((values == 0).sum())
+                profile.negatives += int((values < 0).sum())
+            else:
+                values = series.to_numpy()
+                if kind == "b":
+                    profile.zeros += int((~values.astype(bool)).sum())
+
+            # One hash per cell feeds both the distinct count and the row hash
+            cell_hashes = pd.util.hash_array(values)
+            profile.add_distinct(np.unique(cell_hashes[~isna]))
+            row_hashes = (row_hashes * np.uint64(1000003)) ^ cell_hashes
+
+        unique_hashes = np.unique(row_hashes)
+        seen_before = np.isin(unique_hashes, self._row_hashes, assume_unique=True)
+        self.duplicate_rows += len(row_hashes) - len(unique_hashes) + int(seen_before.sum())
+        self._row_hashes = np.union1d(self._row_hashes, unique_hashes)
+        return self
+
+    def report(self) -> Dict[str, Any]:
+        """Same keys as the previous AutoEDAPipeline._assess_data_quality"""
+        rows = self.rows
+        missing = {col: p.nulls for col, p in self.columns.items()}
+        missing_pct = {col: round(n / rows * 100, 2) if rows else 0.0 for col, n in missing.items()}
+        unique = {col: p.cardinality for col, p in self.columns.items()}
+
+        issues = []
+        for col, p in self.columns.items():
+            if missing_pct[col] > HIGH_MISSING_PERCENT:
+                issues.append(f"High missing values in {col}: {missing_pct[col]:.1f}%")
+            if p.dtype == 'object':
+                # HyperLogLog counts are approximate, so allow its error band
+                is_id = unique[col] == rows if p.hll is None else unique[col] >= rows * 0.98
+                if is_id:
+                    issues.append(f"Potential ID column: {col}")
+
+        return {
+            "shape": (rows, len(self.columns)),
+            "memory_usage": self.memory_usage,
+            "dtypes": pd.Series([p.dtype for p in self.columns.values()], dtype=object).value_counts().to_dict(),
+            "missing_values": missing,
+            "missing_percentage": missing_pct,
+            "duplicate_rows": self.duplicate_rows,
+            "unique_values": unique,
+            "approximate_unique": [col for col, p in self.columns.items() if p.hll is not None],
+            "zero_values": {col: p.zeros for col, p in self.columns.items()},
+            "negative_values": {col: p.negatives for col, p in self.columns.items() if p.dtype.kind in "iuf"},
+            "potential_issues": issues
+        }
+
+
+def profile_frame(df: pd.DataFrame, chunk_rows: int = PROFILE_CHUNK_ROWS) -> Dict[str, Any]:
+    return profile_chunks(df.iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows))
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+    profiler = DataProfiler()
+    for chunk in chunks:
+        profiler.update(chunk)
+    logging.info(f"✅ Profiled {profiler.rows} rows x {len(profiler.columns)} columns")
+    return profiler.report()
+
+
+def profile_csv(path: str, chunk_rows: int = PROFILE_CHUNK_ROWS, **read_kwargs) -> Dict[str, Any]:
+    """Profile a CSV that may not fit in memory"""
+    return profile_chunks(pd.read_csv(path, chunksize=chunk_rows, **read_kwargs))
@@ -0,0 +1,153 @@
+# modules/prompt_context.py
+
+import os
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.modules.streaming_stats import statistics_from_frame, CategoryCounts
+from app.modules.stage_graph import frame_digest
+
+# Upper bound for the dataset part of an insight prompt, whatever the width of the dataset
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "800"))
+# Rough size of a token in characters for English text and numbers; avoids a tokenizer dependency
+CHARS_PER_TOKEN = 4
+TOP_CATEGORIES = 3
+TOP_CORRELATIONS = 10
+# Text columns are described as dates when this many of their values parse as ISO 8601
+DATE_SAMPLE_ROWS = 100
+PROMPT_CONTEXT_CACHE_SIZE = 64
+
+_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _fmt(value: float) -> str:
+    return "nan" if value is None or not np.isfinite(value) else f"{value:.4g}"
+
+
+def _target_correlations(df: pd.DataFrame, target_col: str, numeric_cols: List[str]) -> pd.Series:
+    """Pearson correlation of each numeric column with the target (binary labels as 0/1), by |r|"""
+    target = df[target_col]
+    if not pd.api.types.is_numeric_dtype(target):
+        codes, classes = pd.factorize(target)
+        if len(classes) != 2:
+            return pd.Series(dtype=float)
+        target = pd.Series(np.where(codes < 0, np.nan, codes), index=df.index)
+    features = [col for col in numeric_cols if col != target_col]
+    if not features:
+        return pd.Series(dtype=float)
+    corr = df[features].corrwith(target.astype(np.float64)).dropna()
+    return corr.reindex(corr.abs().sort_values(ascending=False).index)
+
+
+def _infer_task_type(target: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(target) or not pd.api.types.is_numeric_dtype(target) or target.nunique() <= 2:
+        return "classification"
+    return "regression"
+
+
+def _as_datetime(values: pd.Series) -> Optional[pd.Series]:
+    """The column as datetimes if it holds dates (datetime dtype, or ISO 8601 text), else None"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if values.dtype != object:
+        return None
+    sample = values.dropna().head(DATE_SAMPLE_ROWS)
+    if sample.empty or not isinstance(sample.iloc[0], str):
+        return None
+    if pd.to_datetime(sample, errors="coerce", format="ISO8601").isna().any():
+        return None
+    return pd.to_datetime(values, errors="coerce", format="ISO8601")
+
+
+def _column_line(df: pd.DataFrame, col: str, descriptive: Dict[str, Dict[str, float]], missing: float) -> str:
+    dates = None if col in descriptive else _as_datetime(df[col])
+    if dates is not None:
+        summary = f"from {dates.min()} to {dates.max()}"
+        kind = "datetime"
+    elif col in descriptive:
+        d = descriptive[col]
+        summary = (f"min {_fmt(d['min'])} | q1 {_fmt(d['25%'])} | median {_fmt(d['50%'])} | "
+                   f"q3 {_fmt(d['75%'])} | max {_fmt(d['max'])}, mean {_fmt(d['mean'])}")
+        kind = "numeric"
+    else:
+        shares = CategoryCounts().update(df[col]).value_counts(normalize=True)
+        top = ", ".join(f"{value} {share:.0%}" for value, share in shares.head(TOP_CATEGORIES).items())
+        summary = f"{len(shares)} unique, top: {top}"
+        kind = "categorical"
+    return f"- {col}: {kind}, {missing:.0%} missing, {summary}"
+
+
+def _build(df: pd.DataFrame, target_col: Optional[str], task_type: Optional[str], budget_tokens: int) -> str:
+    has_target = bool(target_col) and target_col in df.columns
+    if has_target:
+        task_type = task_type or _infer_task_type(df[target_col])
+    stats = statistics_from_frame(df, target_col if has_target else "", task_type or "regression")
+    descriptive = stats["descriptive"]
+    missing = df.isna().mean()
+
+    header = [f"Dataset: {len(df)} rows x {df.shape[1]} columns."]
+    ordered = list(df.columns)
+    if has_target:
+        header.append(f"Target: {target_col} ({task_type}).")
+        target_stats = stats.get("target", {})
+        if task_type == "classification" and target_stats:
+            balance = target_stats["class_balance"]
+            classes = sorted(balance.items(), key=lambda item: -item[1])[:TOP_CATEGORIES * 2]
+            header.append("Target classes: " + ", ".join(f"{label} {share:.0%}" for label, share in classes))
+        elif target_stats:
+            header.append(f"Target: mean {_fmt(target_stats['mean'])}, median {_fmt(target_stats['median'])}, "
+                          f"std {_fmt(target_stats['std'])}, skew {_fmt(target_stats['skewness'])}")
+        corr = _target_correlations(df, target_col, list(descriptive))
+        if len(corr):
+            header.append("Correlation with target: " + ", ".join(
+                f"{col} {r:+.2f}" for col, r in corr.head(TOP_CORRELATIONS).items()))
+        # Most target-related columns first, so a tight budget drops the least relevant ones
+        ordered = [target_col] + list(corr.index) + [col for col in df.columns
+                                                     if col != target_col and col not in corr.index]
+
+    lines = header + ["Columns (type, missing, distribution):"]
+    used = estimate_tokens("\n".join(lines))
+    for i, col in enumerate(ordered):
+        line = _column_line(df, col, descriptive, float(missing[col]))
+        remaining = len(ordered) - i - 1
+        reserve = estimate_tokens(f"... {remaining} more columns omitted") + 1 if remaining else 0
+        if used + estimate_tokens(line) + 1 + reserve > budget_tokens:
+            lines.append(f"... {len(ordered) - i} more columns omitted")
+            break
+        lines.append(line)
+        used += estimate_tokens(line) + 1
+    return "\n".join(lines)
+
+
+def build_prompt_context(
+    df: pd.DataFrame,
+    target_col: Optional[str] = None,
+    task_type: Optional[str] = None,
+    budget_tokens: int = PROMPT_CONTEXT_TOKENS
+) -> str:
+    """
+    Token-budgeted description of a dataset for LLM prompts: shape, target
+    summary, correlations with the target, then one line per column with its
+    type, missing share and quantiles (numeric) or top categories, most
+    target-related columns first. Numeric summaries come from the same
+    streaming accumulators as the EDA statistics. Cached per dataset hash.
+    """
+    key = (frame_digest(df), target_col, task_type, budget_tokens)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    context = _build(df, target_col, task_type, budget_tokens)
+    logging.info(f"✅ Prompt context built: ~{estimate_tokens(context)} tokens for {df.shape[1]} columns")
+    _cache[key] = context
+    while len(_cache) > PROMPT_CONTEXT_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return context
@@ -0,0 +1,236 @@
+# modules/search_engine.py
+
+import os
+import math
+import time
+import logging
+from typing import Dict, Any, List, Optional, Callable
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import KFold, StratifiedKFold, ParameterGrid, ParameterSampler
+
+from app.modules.ensembles import class_scores
+
+SEARCH_STRATEGIES = ("grid", "random", "halving")
+SEARCH_STRATEGY = os.getenv("SEARCH_STRATEGY", "random")
+# Shared by every model of one upload
+SEARCH_MAX_FITS = int(os.getenv("SEARCH_MAX_FITS", "60"))
+SEARCH_MAX_SECONDS = float(os.getenv("SEARCH_MAX_SECONDS", "300"))
+# Parameter settings sampled per model by the random strategy
+SEARCH_RANDOM_CANDIDATES = int(os.getenv("SEARCH_RANDOM_CANDIDATES", "4"))
+SEARCH_HALVING_ETA = 3
+CV_FOLDS = 3
+
+
+def _take(data, idx):
+    return data.iloc[idx] if hasattr(data, "iloc") else data[idx]
+
+
+class SearchBudget:
+    """
+    Global fit/time allowance consumed by every search of one training run.
+    The final refit of each model is always performed, so `fits` can exceed
+    `max_fits` by at most one fit per model.
+    """
+
+    def __init__(self, max_fits: int = SEARCH_MAX_FITS, max_seconds: float = SEARCH_MAX_SECONDS):
+        self.max_fits = max_fits
+        self.max_seconds = max_seconds
+        self.fits = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def can_afford(self, fits: int = 1) -> bool:
+        return self.fits + fits <= self.max_fits and self.elapsed < self.max_seconds
+
+    def charge(self, fits: int = 1) -> None:
+        self.fits += fits
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "fits_used": self.fits,
+            "max_fits": self.max_fits,
+            "seconds_used": round(self.elapsed, 2),
+            "max_seconds": self.max_seconds
+        }
+
+
+class FoldCache:
+    """CV splits computed once per training set and reused by every model"""
+
+    def __init__(self, X, y, task_type: str, n_splits: int = CV_FOLDS, random_state: int = 42):
+        y_array = np.asarray(y)
+        if task_type == "classification" and np.unique(y_array, return_counts=True)[1].min() >= n_splits:
+            splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        else:
+            splitter = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        self.splits = list(splitter.split(np.zeros(len(y_array)), y_array))
+        self.n_samples = len(y_array)
+        self.target_dtype = y_array.dtype
+        # Global class order, so fold probabilities line up even if a fold misses a class
+        self.classes = np.unique(y_array) if task_type == "classification" else None
+        # Fixed per-fold orderings so a subsample of size k is always the same rows
+        rng = np.random.RandomState(random_state)
+        self._orders = [rng.permutation(train_idx) for train_idx, _ in self.splits]
+
+    def folds(self, fraction: float = 1.0):
+        for (train_idx, val_idx), order in zip(self.splits, self._orders):
+            if fraction < 1.0:
+                train_idx = np.sort(order[:max(CV_FOLDS * 2, int(len(order) * fraction))])
+            yield train_idx, val_idx
+
+
+class HyperparameterSearch:
+    """
+    Pluggable replacement for per-model GridSearchCV.
+
+    `grid` evaluates every setting, `random` samples SEARCH_RANDOM_CANDIDATES
+    settings and `halving` scores all settings on growing fractions of each
+    fold, keeping the best 1/eta each round. Every fit is charged to a shared
+    SearchBudget and recorded in `trace`.
+    """
+
+    def __init__(
+        self,
+        scorer: Callable[[Any, Any], float],
+        strategy: str = SEARCH_STRATEGY,
+        budget: Optional[SearchBudget] = None,
+        n_candidates: int = SEARCH_RANDOM_CANDIDATES,
+        random_state: int = 42
+    ):
+        if strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unknown search strategy '{strategy}'. Choose from {SEARCH_STRATEGIES}")
+        self.scorer = scorer
+        self.strategy = strategy
+        self.budget = budget or SearchBudget()
+        self.n_candidates = n_candidates
+        self.random_state = random_state
+        self.trace: List[Dict[str, Any]] = []
+
+    def _candidates(self, param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        grid = list(ParameterGrid(param_grid))
+        if self.strategy == "random" and len(grid) > self.n_candidates:
+            return list(ParameterSampler(param_grid, n_iter=self.n_candidates, random_state=self.random_state))
+        return grid
+
+    def _fit(self, name: str, estimator, params: Dict[str, Any], X, y, stage: str, fold=None):
+        model = clone(estimator).set_params(**params)
+        start = time.perf_counter()
+        model.fit(X, y)
+        fit_time = time.perf_counter() - start
+        self.budget.charge()
+        entry = {
+            "model": name,
+            "params": params,
+            "stage": stage,
+            "fold": fold,
+            "n_samples": int(len(y)),
+            "fit_time": round(fit_time, 3),
+            "score": None
+        }
+        self.trace.append(entry)
+        return model, entry
+
+    @staticmethod
+    def _predict_proba(model, X, classes) -> Optional[np.ndarray]:
+        # Same class alignment (and one-hot fallback) the ensembles apply at predict time
+        if classes is None or not hasattr(model, "predict_proba"):
+            return None
+        return class_scores(model, X, classes)
+
+    def _cross_validate(self, name, estimator, params, X, y, folds: FoldCache, fraction: float = 1.0,
+                        oof: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """
+        Mean CV score, or None when the budget cannot cover all folds.
+        Out-of-fold predictions (and class probabilities) are written into `oof`.
+        """
+        if not self.budget.can_afford(len(folds.splits)):
+            return None
+        scores = []
+        oof_pred = np.zeros(folds.n_samples, dtype=folds.target_dtype)
+        oof_proba = np.zeros((folds.n_samples, len(folds.classes))) if folds.classes is not None else None
+        for fold, (train_idx, val_idx) in enumerate(folds.folds(fraction)):
+            try:
+                model, entry = self._fit(
+                    name, estimator, params, _take(X, train_idx), _take(y, train_idx), stage=f"cv@{fraction:.2f}",
+                    fold=fold
+                )
+                X_val = _take(X, val_idx)
+                val_pred = model.predict(X_val)
+                score = entry["score"] = round(float(self.scorer(_take(y, val_idx), val_pred)), 4)
+                oof_pred[val_idx] = val_pred
+                val_proba = self._predict_proba(model, X_val, folds.classes)
+                if oof_proba is not None:
+                    if val_proba is None:
+                        oof_proba = None
+                    else:
+                        oof_proba[val_idx] = val_proba
+            except Exception as e:
+                # Invalid combination or a fold the model cannot fit: rank it last, like error_score
+                logging.warning(f"⚠️ {name} {params} failed on fold {fold}: {e}")
+                self.budget.charge()
+                self.trace.append({"model": name, "params": params, "stage": f"cv@{fraction:.2f}",
+                                   "fold": fold, "error": str(e)})
+                return -math.inf
+            scores.append(score)
+        if oof is not None:
+            oof.update({"pred": oof_pred, "proba": oof_proba})
+        return float(np.mean(scores))
+
+    def search(self, name: str, estimator, param_grid: Dict[str, List[Any]], X, y, folds: FoldCache) -> Dict[str, Any]:
+        """
+        Return the refitted best estimator with its params and CV score, plus the
+        out-of-fold predictions of the winning setting (None when it was not cross-validated).
+        """
+        candidates = self._candidates(param_grid) if param_grid else [{}]
+        scores: Dict[int, float] = {}
+        oofs: Dict[int, Dict[str, Any]] = {i: {} for i in range(len(candidates))}
+
+        if len(candidates) > 1 and self.strategy == "halving":
+            survivors = list(range(len(candidates)))
+            rounds = max(1, math.ceil(math.log(len(candidates), SEARCH_HALVING_ETA)))
+            for rung in range(rounds + 1):
+                fraction = min(1.0, SEARCH_HALVING_ETA ** (rung - rounds))
+                rung_scores = {}
+                for i in survivors:
+                    score = self._cross_validate(name, estimator, candidates[i], X, y, folds, fraction, oofs[i])
+                    if score is not None:
+                        rung_scores[i] = score
+                if not rung_scores:
+                    break
+                scores = rung_scores
+                ranked = sorted(rung_scores, key=lambda i: rung_scores[i], reverse=True)
+                if fraction >= 1.0 or len(ranked) == 1:
+                    break
+                survivors = ranked[:max(1, math.ceil(len(ranked) / SEARCH_HALVING_ETA))]
+        elif len(candidates) > 1:
+            for i, params in enumerate(candidates):
+                score = self._cross_validate(name, estimator, params, X, y, folds, oof=oofs[i])
+                if score is None:
+                    logging.warning(f"⚠️ Search budget exhausted while tuning {name}")
+                    break
+                scores[i] = score
+
+        scores = {i: score for i, score in scores.items() if math.isfinite(score)}
+        best_oof = {}
+        if scores:
+            best_index = max(scores, key=lambda i: scores[i])
+            best_params, best_score = candidates[best_index], scores[best_index]
+            best_oof = oofs[best_index]
+        else:
+            # Nothing evaluated within budget: fall back to the estimator's own defaults
+            best_params, best_score = ({} if len(candidates) > 1 else candidates[0]), None
+
+        model, _ = self._fit(name, estimator, best_params, X, y, stage="refit")
+        logging.info(f"✅ {name}: best params {best_params} (cv score {best_score})")
+        return {
+            "model": model,
+            "best_params": best_params,
+            "cv_score": best_score,
+            "oof_pred": best_oof.get("pred"),
+            "oof_proba": best_oof.get("proba")
+        }
@@ -0,0 +1,128 @@
+# modules/stage_graph.py
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Dict, Any, List, Callable, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.utils.disk_cache import DiskCache, code_version
+
+STAGE_CACHE_ENABLED = os.getenv("STAGE_CACHE_ENABLED", "true").lower() == "true"
+STAGE_CACHE_DIR = os.getenv("STAGE_CACHE_DIR", "outputs/cache/stages")
+STAGE_CACHE_MAX_BYTES = int(os.getenv("STAGE_CACHE_MAX_MB", "4096")) * 1024 * 1024
+
+_cache: Optional[DiskCache] = None
+_MISSING = object()
+
+
+def get_stage_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(STAGE_CACHE_DIR, STAGE_CACHE_MAX_BYTES, name="stages")
+    return _cache
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index, column names and dtypes)"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class StageOutput:
+    """Return this from a stage to attach a small summary that is loaded even when the value is not"""
+
+    def __init__(self, value: Any, summary: Any = None):
+        self.value = value
+        self.summary = summary
+
+
+class StageRef:
+    """Handle on a stage result. A cached value is only read from disk when something asks for it."""
+
+    def __init__(self, name: str, key: str, value: Any = _MISSING, folder: Optional[str] = None,
+                 summary: Any = None):
+        self.name = name
+        self.key = key
+        self.summary = summary
+        self._value = value
+        self._folder = folder
+
+    @property
+    def value(self) -> Any:
+        if self._value is _MISSING:
+            self._value = joblib.load(os.path.join(self._folder, "value.joblib"))
+        return self._value
+
+
+class StageGraph:
+    """
+    DAG of named stages. A stage's cache key is the hash of its name, the code
+    version, the keys of its input stages and its parameters, so a rerun only
+    recomputes stages downstream of a changed input or parameter; everything
+    else is read back from the shared on-disk stage cache.
+    """
+
+    def __init__(self, cache: Optional[DiskCache] = None, enabled: bool = STAGE_CACHE_ENABLED):
+        self.cache = (cache or get_stage_cache()) if enabled else None
+        self.version = code_version()
+        self.nodes: List[Dict[str, Any]] = []
+
+    def source(self, name: str, value: Any, digest: str) -> StageRef:
+        """Entry point of the graph, identified by a content digest computed by the caller"""
+        self.nodes.append({"name": name, "inputs": [], "params": {}, "key": digest[:16], "status": "source"})
+        return StageRef(name, digest, value=value)
+
+    def _stage_key(self, name: str, inputs: List[StageRef], params: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            {"stage": name, "code": self.version, "inputs": [ref.key for ref in inputs], "params": params},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def stage(self, name: str, func: Callable, inputs: List[StageRef], params: Optional[Dict[str, Any]] = None) -> StageRef:
+        """Run `func(*input values, **params)` unless a result for the same inputs and params is cached"""
+        params = params or {}
+        key = self._stage_key(name, inputs, params)
+        node = {"name": name, "inputs": [ref.name for ref in inputs], "params": params, "key": key[:16]}
+        self.nodes.append(node)
+        start = time.perf_counter()
+
+        folder = self.cache.get(key) if self.cache else None
+        if folder:
+            summary = joblib.load(os.path.join(folder, "summary.joblib"))
+            node.update({"status": "cached", "seconds": round(time.perf_counter() - start, 3)})
+            logging.info(f"⚡ Stage '{name}' served from cache")
+            return StageRef(name, key, folder=folder, summary=summary)
+
+        output = func(*[ref.value for ref in inputs], **params)
+        value, summary = (output.value, output.summary) if isinstance(output, StageOutput) else (output, None)
+        node.update({"status": "computed", "seconds": round(time.perf_counter() - start, 3)})
+
+        if self.cache:
+            try:
+                self.cache.put(key, {
+                    "value.joblib": lambda path: joblib.dump(value, path),
+                    "summary.joblib": lambda path: joblib.dump(summary, path)
+                })
+            except Exception as e:
+                # Unpicklable value or full disk: the run continues without caching this stage
+                logging.warning(f"⚠️ Could not cache stage '{name}': {e}")
+        return StageRef(name, key, value=value, summary=summary)
+
+    def report(self) -> Dict[str, Any]:
+        stages = [node for node in self.nodes if node["status"] != "source"]
+        return {
+            "stages": self.nodes,
+            "edges": [[parent, node["name"]] for node in self.nodes for parent in node["inputs"]],
+            "cache_hits": sum(1 for node in stages if node["status"] == "cached"),
+            "computed": sum(1 for node in stages if node["status"] == "computed"),
+            "seconds": round(float(np.sum([node.get("seconds", 0.0) for node in stages])), 3)
+        }
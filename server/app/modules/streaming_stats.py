@@ -0,0 +1,297 @@
+# modules/streaming_stats.py
+
+import os
+import math
+import logging
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+STATS_CHUNK_ROWS = int(os.getenv("STATS_CHUNK_ROWS", "250000"))
+KLL_K = 400
+# Quantiles stay exact until a column has seen this many values
+KLL_EXACT_LIMIT = int(os.getenv("KLL_EXACT_LIMIT", "100000"))
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class MomentAccumulator:
+    """
+    Count, mean, M2..M4, min and max for a block of columns, updated one
+    chunk at a time and mergeable with the pairwise formulas of Chan/Pébay
+    (Welford's update generalised to batches).
+    """
+
+    def __init__(self, n_columns: int):
+        shape = (n_columns,)
+        self.n = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.m3 = np.zeros(shape)
+        self.m4 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "MomentAccumulator":
+        """Exact moments of one (rows x columns) float block; NaNs are skipped"""
+        acc = cls(values.shape[1])
+        valid = ~np.isnan(values)
+        acc.n = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            acc.mean = np.where(acc.n > 0, np.nansum(values, axis=0) / acc.n, 0.0)
+            delta = np.where(valid, values - acc.mean, 0.0)
+        delta2 = delta * delta
+        acc.m2 = delta2.sum(axis=0)
+        acc.m3 = (delta2 * delta).sum(axis=0)
+        acc.m4 = (delta2 * delta2).sum(axis=0)
+        if values.shape[0]:
+            acc.min = np.where(valid, values, np.inf).min(axis=0)
+            acc.max = np.where(valid, values, -np.inf).max(axis=0)
+        return acc
+
+    def merge(self, other: "MomentAccumulator") -> "MomentAccumulator":
+        na, nb = self.n, other.n
+        n = na + nb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = other.mean - self.mean
+            ratio = np.where(n > 0, nb / n, 0.0)
+            mean = self.mean + delta * ratio
+            m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+            m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+                  + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+            m4 = (self.m4 + other.m4 + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+                  + 6 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / n ** 2
+                  + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+        empty = n == 0
+        self.mean = np.where(empty, 0.0, mean)
+        self.m2 = np.where(empty, 0.0, m2)
+        self.m3 = np.where(empty, 0.0, m3)
+        self.m4 = np.where(empty, 0.0, m4)
+        self.n = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def update(self, values: np.ndarray) -> "MomentAccumulator":
+        return self.merge(MomentAccumulator.from_values(values))
+
+    # Estimators below match pandas (ddof=1 std, bias-corrected skew and excess kurtosis)
+    def std(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), np.nan)
+
+    def skew(self) -> np.ndarray:
+        n = self.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+            return np.where((n > 2) & (self.m2 > 0), np.sqrt(n * (n - 1)) / (n - 2) * g1,
+                            np.where(n > 2, 0.0, np.nan))
+
+    def kurtosis(self) -> np.ndarray:
+        n = self.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            g2 = n * self.m4 / self.m2 ** 2 - 3
+            return np.where((n > 3) & (self.m2 > 0), ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3)),
+                            np.where(n > 3, 0.0, np.nan))
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch. Values are kept exactly until KLL_EXACT_LIMIT, after
+    which sorted compactors halve each full level into the next one. Sketches
+    of the same column built in different chunks or processes can be merged.
+    """
+
+    def __init__(self, k: int = KLL_K, exact_limit: int = KLL_EXACT_LIMIT, seed: int = 42):
+        self.k = k
+        self.exact_limit = exact_limit
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.RandomState(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        if len(self.levels) == 1 and len(self.levels[0]) <= self.exact_limit:
+            return
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[self._rng.randint(2)::2]])
+            level += 1
+
+    def update(self, values: np.ndarray) -> "KLLSketch":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        if len(self.levels) == 1:
+            # Still exact: same linear interpolation as pandas
+            return np.quantile(self.levels[0], qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, qs * cum[-1], side="left")
+        return items[np.clip(idx, 0, len(items) - 1)]
+
+
+class CategoryCounts:
+    """Exact value counts accumulated over chunks (the target has few classes, so no sketch is needed)"""
+
+    def __init__(self):
+        self.counts = pd.Series(dtype=np.float64)
+
+    def update(self, values: pd.Series) -> "CategoryCounts":
+        self.counts = self.counts.add(values.value_counts(), fill_value=0)
+        return self
+
+    def merge(self, other: "CategoryCounts") -> "CategoryCounts":
+        self.counts = self.counts.add(other.counts, fill_value=0)
+        return self
+
+    def value_counts(self, normalize: bool = False) -> pd.Series:
+        counts = self.counts.sort_values(ascending=False, kind="stable")
+        return counts / counts.sum() if normalize else counts.astype(np.int64)
+
+
+class StreamingStatistics:
+    """
+    Mergeable accumulators behind report["statistics"]: moments and KLL
+    quantiles for every numeric column, plus class counts (classification)
+    or moments and quantiles (regression) for the target.
+    """
+
+    def __init__(self, target_col: str, task_type: str):
+        self.target_col = target_col
+        self.task_type = task_type
+        self.columns: Optional[List[str]] = None
+        self.moments: Optional[MomentAccumulator] = None
+        self.sketches: Dict[str, KLLSketch] = {}
+        self.target_counts = CategoryCounts()
+        self.target_moments = MomentAccumulator(1)
+        self.target_sketch = KLLSketch()
+        self.target_seen = False
+
+    def update(self, chunk: pd.DataFrame) -> "StreamingStatistics":
+        if self.columns is None:
+            # Same column set as DataFrame.describe(): numeric, bool excluded
+            self.columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+            self.moments = MomentAccumulator(len(self.columns))
+            self.sketches = {col: KLLSketch() for col in self.columns}
+
+        values = chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.moments.update(values)
+        for i, col in enumerate(self.columns):
+            self.sketches[col].update(values[:, i])
+
+        if self.target_col in chunk.columns:
+            self.target_seen = True
+            target = chunk[self.target_col]
+            if self.task_type == "classification":
+                self.target_counts.update(target)
+            else:
+                target_values = pd.to_numeric(target, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                self.target_moments.update(target_values.reshape(-1, 1))
+                self.target_sketch.update(target_values)
+        return self
+
+    def merge(self, other: "StreamingStatistics") -> "StreamingStatistics":
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns, self.moments, self.sketches = other.columns, other.moments, other.sketches
+        else:
+            self.moments.merge(other.moments)
+            for col in self.columns:
+                self.sketches[col].merge(other.sketches[col])
+        self.target_counts.merge(other.target_counts)
+        self.target_moments.merge(other.target_moments)
+        self.target_sketch.merge(other.target_sketch)
+        self.target_seen = self.target_seen or other.target_seen
+        return self
+
+    def _descriptive(self) -> Dict[str, Dict[str, float]]:
+        acc = self.moments
+        std = acc.std()
+        descriptive = {}
+        for i, col in enumerate(self.columns or []):
+            n = acc.n[i]
+            q25, q50, q75 = self.sketches[col].quantiles(DESCRIBE_QUANTILES)
+            descriptive[col] = {
+                "count": float(n),
+                "mean": float(acc.mean[i]) if n else np.nan,
+                "std": float(std[i]),
+                "min": float(acc.min[i]) if n else np.nan,
+                "25%": float(q25),
+                "50%": float(q50),
+                "75%": float(q75),
+                "max": float(acc.max[i]) if n else np.nan
+            }
+        return descriptive
+
+    def report(self) -> Dict[str, Any]:
+        """Same structure as the previous in-memory _statistical_analysis"""
+        stats = {"descriptive": self._descriptive()}
+        if not self.target_seen:
+            # No target given (e.g. describing a dataset for a chat prompt) is not an error
+            if self.target_col:
+                logging.warning(f"⚠️ Target column '{self.target_col}' not found in dataset.")
+            return stats
+
+        if self.task_type == "classification":
+            counts = self.target_counts.value_counts()
+            stats["target"] = {
+                "unique_classes": int(len(counts)),
+                "class_distribution": counts.to_dict(),
+                "class_balance": self.target_counts.value_counts(normalize=True).to_dict()
+            }
+        else:
+            acc = self.target_moments
+            stats["target"] = {
+                "mean": float(acc.mean[0]) if acc.n[0] else float("nan"),
+                "median": float(self.target_sketch.quantiles([0.5])[0]),
+                "std": float(acc.std()[0]),
+                "skewness": float(acc.skew()[0]),
+                "kurtosis": float(acc.kurtosis()[0])
+            }
+        return stats
+
+
+def statistics_from_chunks(chunks: Iterable[pd.DataFrame], target_col: str, task_type: str) -> Dict[str, Any]:
+    accumulator = StreamingStatistics(target_col, task_type)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.report()
+
+
+def statistics_from_frame(df: pd.DataFrame, target_col: str, task_type: str,
+                          chunk_rows: int = STATS_CHUNK_ROWS) -> Dict[str, Any]:
+    chunks = (df.iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows))
+    return statistics_from_chunks(chunks, target_col, task_type)
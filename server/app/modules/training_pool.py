@@ -0,0 +1,136 @@
+# modules/training_pool.py
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import traceback
+from typing import Dict, Any, Optional
+
+import numpy as np
+import joblib
+from joblib.externals.loky import get_reusable_executor
+
+from app.utils.cpu import JOB_CPU_SHARE
+
+MODEL_TRAIN_WORKERS = int(os.getenv("MODEL_TRAIN_WORKERS", str(JOB_CPU_SHARE)))
+MODEL_TIMEOUT_SECONDS = float(os.getenv("MODEL_TIMEOUT_SECONDS", "900"))
+POLL_INTERVAL_SECONDS = 0.2
+# Idle pool workers stay alive this long so back-to-back uploads skip the spawn/import cost
+WORKER_IDLE_SECONDS = 300
+
+
+class SharedArrays:
+    """
+    Dump training arrays once to a temp folder so every worker opens the same
+    read-only memory map instead of receiving its own pickled copy.
+    """
+
+    def __init__(self, **arrays):
+        self.arrays = arrays
+        self.folder = None
+        self.paths: Dict[str, str] = {}
+
+    def __enter__(self) -> Dict[str, str]:
+        self.folder = tempfile.mkdtemp(prefix="insightforge_train_")
+        for name, array in self.arrays.items():
+            path = os.path.join(self.folder, f"{name}.joblib")
+            joblib.dump(np.ascontiguousarray(array), path)
+            self.paths[name] = path
+        return self.paths
+
+    def __exit__(self, exc_type, exc, tb):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def _load_shared(paths: Dict[str, str]) -> Dict[str, np.ndarray]:
+    return {name: joblib.load(path, mmap_mode="r") for name, path in paths.items()}
+
+
+def _fit_arrays(estimator, arrays: Dict[str, Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    estimator.fit(arrays["X_train"], arrays["y_train"])
+    fit_time = time.perf_counter() - start
+    y_pred = estimator.predict(arrays["X_test"])
+    return {"model": estimator, "y_pred": y_pred, "fit_time": round(fit_time, 3)}
+
+
+def _fit_candidate(estimator, paths: Dict[str, str], started_marker: str) -> Dict[str, Any]:
+    """Worker entry point: fit one estimator on the memory-mapped split and predict the test set"""
+    # The marker lets the parent start the timeout clock when the fit begins, not when it was queued
+    open(started_marker, "w").close()
+    return _fit_arrays(estimator, _load_shared(paths))
+
+
+def fit_candidates(
+    candidates: Dict[str, Any],
+    X_train,
+    y_train,
+    X_test,
+    n_workers: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Train independent candidate models concurrently.
+
+    Returns a dict in the same order as `candidates`. Each entry holds either
+    `model`, `y_pred` and `fit_time`, or an `error` message (failure or timeout).
+    Estimators should carry a fixed random_state so results do not depend on scheduling.
+    """
+    n_workers = max(1, min(n_workers or MODEL_TRAIN_WORKERS, len(candidates)))
+    timeout = timeout or MODEL_TIMEOUT_SECONDS
+    arrays = {"X_train": np.asarray(X_train), "y_train": np.asarray(y_train), "X_test": np.asarray(X_test)}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    if n_workers == 1:
+        for name, estimator in candidates.items():
+            try:
+                results[name] = _fit_arrays(estimator, arrays)
+            except Exception as e:
+                logging.error(f"❌ Training {name} failed: {e}")
+                results[name] = {"error": str(e)}
+        return results
+
+    logging.info(f"⚙️ Training {len(candidates)} models on {n_workers} workers (timeout {timeout}s each)")
+    timed_out = False
+    # Split this job's cores between workers so BLAS/OpenMP inside each fit does not oversubscribe
+    threads = str(max(1, JOB_CPU_SHARE // n_workers))
+    thread_env = {var: threads for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")}
+
+    with SharedArrays(**arrays) as paths:
+        executor = get_reusable_executor(max_workers=n_workers, timeout=WORKER_IDLE_SECONDS, env=thread_env)
+        try:
+            markers = {name: os.path.join(os.path.dirname(paths["X_train"]), f"started_{i}")
+                       for i, name in enumerate(candidates)}
+            futures = {name: executor.submit(_fit_candidate, estimator, paths, markers[name])
+                       for name, estimator in candidates.items()}
+            pending = set(futures)
+
+            while pending:
+                now = time.time()
+                for name in list(pending):
+                    future = futures[name]
+                    if future.done():
+                        pending.discard(name)
+                        try:
+                            results[name] = future.result()
+                            logging.info(f"✅ {name} trained in {results[name]['fit_time']}s")
+                        except Exception as e:
+                            logging.error(f"❌ Training {name} failed: {e}")
+                            traceback.print_exc()
+                            results[name] = {"error": str(e)}
+                    elif os.path.exists(markers[name]) and now - os.path.getmtime(markers[name]) > timeout:
+                        pending.discard(name)
+                        future.cancel()
+                        timed_out = True
+                        logging.warning(f"⚠️ {name} exceeded {timeout}s and was abandoned")
+                        results[name] = {"error": f"Timed out after {timeout:.0f}s"}
+                if pending:
+                    time.sleep(POLL_INTERVAL_SECONDS)
+        finally:
+            if timed_out:
+                # Workers still stuck on an abandoned fit are killed; the next call spawns a fresh pool
+                executor.shutdown(wait=False, kill_workers=True)
+
+    return {name: results[name] for name in candidates}
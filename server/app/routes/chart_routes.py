@@ -1,17 +1,23 @@
 # chart_routes.py
 from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from app.dependencies.auth import require_authentication
 from app.config.db import chart_insights_collection
-from app.services.ocr_services import extract_text_from_pdf, generate_insight_with_llm, load_dataset
+from app.services.ocr_services import extract_text_from_pdf, generate_insight_with_llm, load_dataset, dataset_preview
 from app.controllers.chart_controller import (
     process_uploaded_files,
     generate_response_from_question,
-    write_chat_to_file
+    stream_response_from_question,
+    write_chat_to_file,
+    get_ocr_cache_stats,
+    get_llm_cache_stats
 )
 
 import os
+import json
+import time
 import shutil
 import traceback
 from datetime import datetime
@@ -23,12 +29,45 @@ templates = Jinja2Templates(directory="app/templates")
 
 router = APIRouter()
 
+
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _stream_answer(question: str, context: str, persist) -> StreamingResponse:
+    """
+    Server-sent events: {"token": ...} per chunk, then {"done": true, "answer": ...}
+    once `persist(answer)` has stored the full answer, or {"error": ...}.
+    """
+    async def events():
+        start = time.perf_counter()
+        parts = []
+        try:
+            async for token in stream_response_from_question(question, context):
+                if not parts:
+                    print(f"[STREAM] First token after {time.perf_counter() - start:.2f}s")
+                parts.append(token)
+                yield _sse({"token": token})
+            answer = "".join(parts)
+            await persist(answer)
+            print(f"[STREAM] Answer complete: {len(answer)} chars in {time.perf_counter() - start:.2f}s")
+            yield _sse({"done": True, "answer": answer})
+        except Exception as e:
+            print("⚠️ Error while streaming answer:")
+            print(traceback.format_exc())
+            yield _sse({"error": f"❌ Error occurred: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @router.api_route("/chart-talk", methods=["GET", "POST"])
 async def chart_talk(
     request: Request,
     pdf_file: UploadFile = File(None),
     csv_file: UploadFile = File(None),
     question: str = Form(None),
+    stream: bool = Form(False),
     current_user: dict = Depends(require_authentication)
 ):
     session = request.session
@@ -37,6 +76,8 @@ async def chart_talk(
     if 'chat_history' not in session:
         print("💬 chat_history not in session — initializing...")
         session['chat_history'] = []
+    # How the chart text was extracted (per-page method and timings), reported with a new upload
+    ocr_timings = None
 
     try:
         if request.method == "POST":
@@ -67,15 +108,18 @@ async def chart_talk(
                     shutil.copyfileobj(csv_file.file, f)
 
                 print("🔍 Extracting text from PDF...")
-                chart_text = extract_text_from_pdf(pdf_path)
+                # OCR blocks for seconds per page; keep the event loop free for other requests
+                chart_text, ocr_timings = await run_in_threadpool(extract_text_from_pdf, pdf_path)
                 print("✅ Extracted chart text.")
 
                 print("📥 Loading dataset from CSV...")
-                df = load_dataset(csv_path)
+                # Parsing and summarising the CSV are CPU-bound too
+                df = await run_in_threadpool(load_dataset, csv_path)
+                preview = await run_in_threadpool(dataset_preview, df)
                 print("✅ CSV loaded into DataFrame.")
 
                 print("🧠 Generating insight from chart text and data...")
-                insight = generate_insight_with_llm(chart_text, df)
+                insight = await generate_insight_with_llm(chart_text, df, preview=preview)
                 print("✅ Insight generated.")
 
                 insight_id = str(uuid4())
@@ -91,13 +135,28 @@ async def chart_talk(
                     "pdf_path": pdf_path,
                     "csv_path": csv_path,
                     "insight": insight,
+                    "ocr_timings": ocr_timings,
                     "chat_history": []
                 })
 
+            elif question and stream:
+                print(f"❓ Received question (streaming): {question}")
+                insight_id = session.get("insight_id")
+
+                async def persist(reply):
+                    # Session cookies are sent with the first chunk, so the stored history lives in MongoDB only
+                    if insight_id:
+                        await chart_insights_collection.update_one(
+                            {"user_id": current_user["_id"], "insight_id": insight_id},
+                            {"$push": {"chat_history": {"question": question, "answer": reply}}}
+                        )
+
+                return _stream_answer(question, session.get("insight", ""), persist)
+
             elif question:
                 print(f"❓ Received question: {question}")
                 context = session.get("insight", "")
-                reply = generate_response_from_question(question, context)
+                reply = await generate_response_from_question(question, context)
                 print(f"💡 Generated reply: {reply}")
 
                 chat_entry = {"question": question, "answer": reply}
@@ -128,7 +187,8 @@ async def chart_talk(
         "status": "success",
         "insight": session.get("insight", ""),
         "chat_history": session.get("chat_history", []),
-        "insight_id": session.get("insight_id")
+        "insight_id": session.get("insight_id"),
+        "ocr_timings": ocr_timings
     }
 
 
@@ -137,13 +197,27 @@ async def ask_question(
     request: Request,
     question: str = Form(...),
     context: str = Form(""),
+    stream: bool = Form(False),
     current_user: dict = Depends(require_authentication)
 ):
     try:
         print(f"[ASK] Received question: {question}")
         print(f"[ASK] Context: {context[:100]}...")
 
-        reply = generate_response_from_question(question, context)
+        if stream:
+            insight_id = request.session.get("insight_id")
+
+            async def persist(reply):
+                # Session cookies are sent with the first chunk, so the stored history lives in MongoDB only
+                if insight_id:
+                    await chart_insights_collection.update_one(
+                        {"user_id": current_user["_id"], "insight_id": insight_id},
+                        {"$push": {"chat_history": (question, reply)}}
+                    )
+
+            return _stream_answer(question, context, persist)
+
+        reply = await generate_response_from_question(question, context)
         print(f"[ASK] Generated reply: {reply}")
 
         session = request.session
@@ -172,6 +246,15 @@ async def ask_question(
             "traceback": error_trace
         }
     
+@router.get("/ocr/cache/stats")
+async def ocr_cache_stats_route(current_user: dict = Depends(require_authentication)):
+    return get_ocr_cache_stats()
+
+
+@router.get("/llm/cache/stats")
+async def llm_cache_stats_route(current_user: dict = Depends(require_authentication)):
+    return get_llm_cache_stats()
+
 #     -----------------------------👌 ---------------------------------
 # esse use krna frontend me 
 # const res = await axios.post("/chart-talk", formData);
@@ -5,7 +5,13 @@ from typing import Dict, Any
 
 
 
-from app.controllers.ml_controller import upload_dataset
+from app.controllers.ml_controller import (
+    upload_dataset,
+    get_upload_job_status,
+    get_upload_job_report,
+    render_upload_job_result,
+    get_result_cache_stats
+)
 from app.dependencies.auth import require_authentication
 
 router = APIRouter()
@@ -25,9 +31,44 @@ async def upload_dataset_route(
     file: UploadFile = File(...),
     task_type: str = Form(...),
     target_col: str = Form(...),
-    pdf_file: UploadFile = File(None)
+    pdf_file: UploadFile = File(None),
+    selection_mode: str = Form(None),
+    imputation_strategy: str = Form(None)
 ):
-    return await upload_dataset(request, file, task_type, target_col, pdf_file,current_user)
+    return await upload_dataset(request, file, task_type, target_col, pdf_file,current_user, selection_mode,
+                                imputation_strategy)
+
+
+@router.get("/jobs/{job_id}")
+async def upload_job_status(
+    job_id: str,
+    current_user: Dict[str, Any] = Depends(require_authentication)
+):
+    return get_upload_job_status(job_id, current_user)
+
+
+@router.get("/jobs/{job_id}/report")
+async def upload_job_report(
+    job_id: str,
+    current_user: Dict[str, Any] = Depends(require_authentication)
+):
+    return get_upload_job_report(job_id, current_user)
+
+
+@router.get("/cache/stats")
+async def result_cache_stats_route(
+    current_user: Dict[str, Any] = Depends(require_authentication)
+):
+    return get_result_cache_stats()
+
+
+@router.get("/jobs/{job_id}/result")
+async def upload_job_result(
+    request: Request,
+    job_id: str,
+    current_user: Dict[str, Any] = Depends(require_authentication)
+):
+    return render_upload_job_result(request, job_id, current_user)
 
 
 
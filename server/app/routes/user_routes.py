@@ -6,6 +6,7 @@ from pydantic import EmailStr
 
 from app.models.user import UserCreate, UserLoginSchema, TokenResponse, RegisterResponse
 from app.services.auth_services import register_user, login_user, logout_user
+from app.services.session_cache import get_session_cache
 from app.dependencies.auth import require_authentication
 
 router = APIRouter()
@@ -50,3 +51,11 @@ async def get_current_user(
     """Get current authenticated user"""
     print("Fetching current user info... 🕵️‍♂️")
     return current_user
+
+
+@router.get("/session/stats", response_model=Dict[str, Any])
+async def session_cache_stats(
+    current_user: Dict[str, Any] = Depends(require_authentication),
+):
+    """Session cache hit rate and authentication latency"""
+    return get_session_cache().stats()
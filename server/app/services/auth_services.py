@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional, Tuple
 from fastapi import HTTPException, Request, Response
 
 from app.config.db import users_collection, sessions_collection
+from app.services.session_cache import get_session_cache
 from app.utils.security import (
     hash_password, 
     verify_password, 
@@ -230,6 +231,7 @@ async def logout_user(session_id: str, response: Response) -> Dict[str, str]:
             {"_id": session_id},
             {"$set": {"valid": False, "logged_out_at": datetime.utcnow()}}
         )
+        await get_session_cache().invalidate(session_id)
         #upper wala ye sbb bi return krega 
         print("\n--- Update Result Summary ---")
         print(f"Matched Documents   : {result.matched_count}")# Number of matched documents (0 or 1)
@@ -0,0 +1,173 @@
+# app/services/ingest_services.py
+
+import os
+import logging
+from typing import Dict, Any, List, Tuple, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import UploadFile, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "5120")) * 1024 * 1024
+# Whole request body (an upload carries a CSV and an optional PDF), checked before the form is parsed
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_MB", str(2 * MAX_UPLOAD_BYTES // (1024 * 1024)))) * 1024 * 1024
+
+# Rows read up front to decide the dtypes used for the full load
+DTYPE_SAMPLE_ROWS = int(os.getenv("DTYPE_SAMPLE_ROWS", "50000"))
+# Text columns whose distinct/total ratio in the sample stays below this become `category`
+CATEGORY_MAX_RATIO = 0.5
+# Largest integer a float32 can hold exactly
+FLOAT32_EXACT_INT = 2 ** 24
+
+try:
+    import pyarrow  # noqa: F401
+    _DEFAULT_ENGINE = "pyarrow"
+except ImportError:
+    _DEFAULT_ENGINE = "c"
+
+CSV_ENGINE = os.getenv("CSV_ENGINE", _DEFAULT_ENGINE)
+
+
+async def save_upload_file(
+    upload: UploadFile,
+    path: str,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    hasher=None
+) -> int:
+    """
+    Stream an upload to `path` in fixed-size chunks, enforcing a size cap. Returns bytes written.
+    A hashlib object passed as `hasher` is fed every chunk, so the file is hashed without a second read.
+    By now Starlette has spooled the whole form; UploadSizeLimitMiddleware caps that first copy.
+    """
+    written = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"❌ File too large. Maximum upload size is {max_bytes // (1024 * 1024)} MB."
+                    )
+                f.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+    except HTTPException:
+        os.remove(path)
+        raise
+    print(f"💾 Saved {written / (1024 * 1024):.1f} MB to {path}")
+    return written
+
+
+def _too_large(max_bytes: int) -> str:
+    return f"❌ Request too large. Maximum request size is {max_bytes // (1024 * 1024)} MB."
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects request bodies over `max_bytes` with a 413 before the form is
+    spooled to disk: at once when Content-Length says so, otherwise (chunked
+    bodies) as soon as the bytes received pass the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse({"detail": _too_large(self.max_bytes)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside request.form(), so FastAPI answers with this 413
+                    raise HTTPException(status_code=413, detail=_too_large(self.max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def infer_compact_dtypes(path: str, sample_rows: int = DTYPE_SAMPLE_ROWS) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Inspect a sample of the CSV and choose compact dtypes.
+    Returns the dtypes that are safe to apply while parsing, and the columns
+    that should be integer-downcast once the full column is known.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, encoding='utf-8')
+    parse_dtypes: Dict[str, Any] = {}
+    downcast_cols: List[str] = []
+
+    for col in sample.columns:
+        series = sample[col]
+        if series.dtype == 'object':
+            # Dirty numeric text ("1,200", "₹5k") is converted later by the EDA cleaning step
+            if pd.to_numeric(series, errors='coerce').notna().mean() > 0.5:
+                continue
+            non_null = series.dropna()
+            if len(non_null) and non_null.nunique() / len(non_null) <= CATEGORY_MAX_RATIO:
+                parse_dtypes[col] = 'category'
+        elif series.dtype.kind == 'f':
+            values = series.dropna().to_numpy()
+            if len(values) and np.all(np.mod(values, 1) == 0):
+                # Integral floats (ints with gaps): range is only known after the full load
+                downcast_cols.append(col)
+            else:
+                parse_dtypes[col] = 'float32'
+        elif series.dtype.kind in 'iu':
+            downcast_cols.append(col)
+
+    return parse_dtypes, downcast_cols
+
+
+def _downcast_integral(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    for col in columns:
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if series.dtype.kind in 'iu':
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype.kind == 'f':
+            if not series.isna().any() and np.all(np.mod(series.to_numpy(), 1) == 0):
+                df[col] = pd.to_numeric(series.astype(np.int64), downcast='integer')
+            elif series.abs().max() < FLOAT32_EXACT_INT:
+                df[col] = series.astype(np.float32)
+    return df
+
+
+def read_csv_compact(path: str, engine: Optional[str] = None, sample_rows: int = DTYPE_SAMPLE_ROWS) -> pd.DataFrame:
+    """Load a CSV with the C/pyarrow parser using dtypes inferred from a sample"""
+    engine = engine or CSV_ENGINE
+    parse_dtypes, downcast_cols = infer_compact_dtypes(path, sample_rows)
+    logging.info(f"🔍 Inferred compact dtypes from sample: {parse_dtypes}")
+
+    try:
+        df = pd.read_csv(path, encoding='utf-8', engine=engine, dtype=parse_dtypes)
+    except (ValueError, TypeError) as e:
+        # A value outside the sample contradicted the inferred dtype (or pyarrow rejected the file)
+        logging.warning(f"⚠️ Compact parse with engine='{engine}' failed ({e}); retrying with default dtypes")
+        df = pd.read_csv(path, encoding='utf-8', engine='c')
+        downcast_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    df = _downcast_integral(df, downcast_cols)
+    logging.info(f"✅ Loaded {df.shape} using {df.memory_usage(deep=True).sum() / (1024 * 1024):.1f} MB")
+    return df
@@ -0,0 +1,54 @@
+# app/services/insight_orchestrator.py
+
+import time
+import asyncio
+from typing import Dict, Any
+
+import pandas as pd
+
+from app.services.ocr_services import generate_insight_with_llm, dataset_preview
+from app.modules.insight_refiner import clean_and_structure, generate_questions_batch
+
+
+async def generate_insights(chart_texts: Dict[str, str], df: pd.DataFrame, target_col: str = None,
+                            task_type: str = None) -> Dict[str, Any]:
+    """
+    Insights for several chart sources of one upload (e.g. {"EDA": ..., "PowerBI": ...}).
+
+    The dataset summary is built once and shared, the LLM calls run
+    concurrently, and the follow-up questions for all insights come from one
+    batched spaCy pass. Returns {"insights": {label: {"insight", "questions"}},
+    "timings": {...}} with the latency of each step and each LLM call.
+    """
+    start = time.perf_counter()
+    preview = dataset_preview(df, target_col=target_col, task_type=task_type)
+    preview_seconds = time.perf_counter() - start
+
+    async def timed_call(label: str, text: str):
+        call_start = time.perf_counter()
+        insight = await generate_insight_with_llm(text, df, preview=preview)
+        return label, insight, time.perf_counter() - call_start
+
+    llm_start = time.perf_counter()
+    results = await asyncio.gather(*(timed_call(label, text) for label, text in chart_texts.items()))
+    llm_seconds = time.perf_counter() - llm_start
+
+    questions_start = time.perf_counter()
+    questions = generate_questions_batch([insight for _, insight, _ in results])
+    questions_seconds = time.perf_counter() - questions_start
+
+    timings = {
+        "preview_seconds": round(preview_seconds, 3),
+        "llm_seconds": {label: round(seconds, 3) for label, _, seconds in results},
+        "llm_wall_seconds": round(llm_seconds, 3),
+        "questions_seconds": round(questions_seconds, 3),
+        "total_seconds": round(time.perf_counter() - start, 3)
+    }
+    print(f"✅ Generated {len(results)} insights: {timings}")
+    return {
+        "insights": {
+            label: {"insight": clean_and_structure(insight), "questions": question_list}
+            for (label, insight, _), question_list in zip(results, questions)
+        },
+        "timings": timings
+    }
@@ -0,0 +1,261 @@
+# app/services/job_services.py
+
+import os
+import json
+import sqlite3
+import threading
+import traceback
+from datetime import datetime
+from uuid import uuid4
+from typing import Dict, Any, Optional, Callable, List
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+from app.modules.insight_refiner import preload_nlp
+from app.utils.cpu import JOB_WORKERS
+
+# SQLite keeps job state visible to every worker process (and survives reloads)
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "outputs/jobs.db")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(JOBS_DB_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(JOBS_DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def init_job_store() -> None:
+    """Create the jobs table and fail unfinished jobs whose owning process is gone"""
+    with _connect() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                stages TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                params TEXT,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                owner_pid INTEGER
+            )
+            """
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "owner_pid" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+
+        # Other API workers keep running their jobs; only jobs of a process that exited are lost.
+        # A job owned by our own pid comes from an earlier process that had the same pid.
+        unfinished = conn.execute(
+            "SELECT id, owner_pid FROM jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RUNNING)
+        ).fetchall()
+        orphaned = [row["id"] for row in unfinished
+                    if row["owner_pid"] == os.getpid() or not _process_alive(row["owner_pid"])]
+        now = datetime.utcnow().isoformat()
+        conn.executemany(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+            [(JOB_FAILED, "Interrupted by server restart", now, job_id, JOB_QUEUED, JOB_RUNNING)
+             for job_id in orphaned]
+        )
+    if orphaned:
+        print(f"[JOBS] Marked {len(orphaned)} orphaned job(s) as failed")
+
+
+def _json_default(value: Any) -> Any:
+    # numpy scalars / arrays and anything else the report may carry
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default)
+
+
+def create_job(user_id: str, kind: str, stages: List[str], params: Dict[str, Any]) -> str:
+    """Register a new queued job and return its id"""
+    job_id = str(uuid4())
+    now = datetime.utcnow().isoformat()
+    stage_state = [{"name": name, "status": "pending", "started_at": None, "finished_at": None} for name in stages]
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, user_id, kind, status, stage, stages, progress, params, created_at, updated_at, "
+            "owner_pid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, user_id, kind, JOB_QUEUED, None, _dumps(stage_state), 0.0, _dumps(params), now, now,
+             os.getpid())
+        )
+    print(f"[JOBS] Created {kind} job {job_id} for user {user_id}")
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not row:
+        return None
+    job = dict(row)
+    job["stages"] = json.loads(job["stages"])
+    job["params"] = json.loads(job["params"]) if job["params"] else {}
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def start_stage(job_id: str, stage: str) -> None:
+    """Mark `stage` as running; earlier running stages are closed and progress advanced"""
+    now = datetime.utcnow().isoformat()
+    with _connect() as conn:
+        row = conn.execute("SELECT stages, status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row or row["status"] in FINISHED_STATUSES:
+            return
+        stages = json.loads(row["stages"])
+        for entry in stages:
+            if entry["status"] == "running":
+                entry["status"] = "done"
+                entry["finished_at"] = now
+            if entry["name"] == stage:
+                entry["status"] = "running"
+                entry["started_at"] = now
+        done = sum(1 for entry in stages if entry["status"] in ("done", "skipped"))
+        progress = round(done / len(stages) * 100, 1) if stages else 0.0
+        conn.execute(
+            "UPDATE jobs SET status = ?, stage = ?, stages = ?, progress = ?, updated_at = ? "
+            "WHERE id = ? AND status NOT IN (?, ?)",
+            (JOB_RUNNING, stage, _dumps(stages), progress, now, job_id, *FINISHED_STATUSES)
+        )
+    print(f"[JOBS] Job {job_id} -> {stage} ({progress}%)")
+
+
+def _finish(job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> bool:
+    """Record the outcome; False when the job had already finished (e.g. failed as orphaned)"""
+    now = datetime.utcnow().isoformat()
+    with _connect() as conn:
+        row = conn.execute("SELECT stages, status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row or row["status"] in FINISHED_STATUSES:
+            return False
+        stages = json.loads(row["stages"])
+        for entry in stages:
+            if entry["status"] == "running":
+                entry["status"] = "done" if status == JOB_COMPLETED else "failed"
+                entry["finished_at"] = now
+            elif entry["status"] == "pending" and status == JOB_COMPLETED:
+                entry["status"] = "skipped"
+        updated = conn.execute(
+            "UPDATE jobs SET status = ?, stages = ?, progress = COALESCE(?, progress), result = ?, error = ?, "
+            "updated_at = ? WHERE id = ? AND status NOT IN (?, ?)",
+            (status, _dumps(stages), 100.0 if status == JOB_COMPLETED else None,
+             _dumps(result) if result is not None else None, error, now, job_id, *FINISHED_STATUSES)
+        ).rowcount
+    return updated > 0
+
+
+def complete_job(job_id: str, result: Any) -> None:
+    if _finish(job_id, JOB_COMPLETED, result=result):
+        print(f"[JOBS] ✅ Job {job_id} completed")
+    else:
+        print(f"[JOBS] ⚠️ Job {job_id} had already finished; result not recorded")
+
+
+def fail_job(job_id: str, error: str) -> None:
+    if _finish(job_id, JOB_FAILED, error=error):
+        print(f"[JOBS] ❌ Job {job_id} failed: {error}")
+
+
+def _run_job(job_id: str, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> None:
+    """Executed inside a pool worker; records the outcome in the job store"""
+    try:
+        result = func(job_id, *args, **kwargs)
+        complete_job(job_id, result)
+    except Exception as e:
+        traceback.print_exc()
+        fail_job(job_id, str(getattr(e, "detail", e)))
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            print(f"[JOBS] Starting process pool with {JOB_WORKERS} workers")
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS, initializer=preload_nlp)
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool (a worker died) so the next job starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is not executor:
+            return
+        _executor = None
+    print("[JOBS] ⚠️ Process pool is broken; a new one starts with the next job")
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _on_job_done(job_id: str, executor: ProcessPoolExecutor) -> Callable[[Future], None]:
+    def callback(future: Future) -> None:
+        # _run_job records the job's own errors; this catches the ones it never got to see
+        if future.cancelled():
+            fail_job(job_id, "Job was cancelled before it started")
+            return
+        error = future.exception()
+        if error is None:
+            return
+        fail_job(job_id, f"Job worker failed: {error!r}")
+        if isinstance(error, BrokenProcessPool):
+            _discard_executor(executor)
+    return callback
+
+
+def submit_job(job_id: str, func: Callable, *args, **kwargs) -> None:
+    """Run `func(job_id, *args, **kwargs)` in the process pool; `func` must be importable"""
+    executor = get_executor()
+    try:
+        future = executor.submit(_run_job, job_id, func, args, kwargs)
+    except BrokenProcessPool:
+        # A worker died after the last job finished, so no callback has replaced the pool yet
+        _discard_executor(executor)
+        executor = get_executor()
+        try:
+            future = executor.submit(_run_job, job_id, func, args, kwargs)
+        except Exception as e:
+            fail_job(job_id, f"Could not start job: {e!r}")
+            raise
+    future.add_done_callback(_on_job_done(job_id, executor))
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,160 @@
+# app/services/llm_cache.py
+
+import os
+import re
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, FrozenSet
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+# Near-duplicate questions ("what drives sales" / "What drives sales?") reuse an answer for the same context
+LLM_CACHE_NEAR_DUPLICATES = os.getenv("LLM_CACHE_NEAR_DUPLICATES", "false").lower() == "true"
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0.9"))
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalised, case-folded, whitespace-collapsed text"""
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def _tokens(text: str) -> FrozenSet[str]:
+    return frozenset(_WORD.findall(normalize_text(text)))
+
+
+class LLMResponseCache:
+    """
+    In-process LRU cache of LLM responses with a time-to-live.
+
+    Exact key: model, temperature and the normalised prompt. When `question`
+    and `scope` (e.g. the insight a chat is about) are given and near-duplicate
+    lookup is on, a miss falls back to the most similar cached question in
+    the same scope whose word-set Jaccard similarity is at least `similarity`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        near_duplicates: bool = LLM_CACHE_NEAR_DUPLICATES,
+        similarity: float = LLM_CACHE_SIMILARITY
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicates = near_duplicates
+        self.similarity = similarity
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._scopes: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "near_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def key(model: str, prompt: str, temperature: float) -> str:
+        return _digest(model, float(temperature), normalize_text(prompt))
+
+    @staticmethod
+    def scope_key(model: str, scope: str, temperature: float) -> str:
+        return _digest("scope", model, float(temperature), normalize_text(scope))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        keys = self._scopes.get(entry["scope"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._scopes[entry["scope"]]
+
+    def _live(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= now:
+            self._drop(key)
+            self.counters["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, model: str, prompt: str, temperature: float, scope: Optional[str] = None,
+            question: Optional[str] = None) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._live(self.key(model, prompt, temperature), now)
+            if entry is not None:
+                self.counters["hits"] += 1
+                return entry["response"]
+
+            if self.near_duplicates and scope is not None and question:
+                tokens = _tokens(question)
+                best_key, best_score = None, self.similarity
+                for key in list(self._scopes.get(self.scope_key(model, scope, temperature), ())):
+                    candidate = self._live(key, now)
+                    if candidate is None or not (tokens or candidate["tokens"]):
+                        continue
+                    score = len(tokens & candidate["tokens"]) / len(tokens | candidate["tokens"])
+                    if score >= best_score:
+                        best_key, best_score = key, score
+                if best_key is not None:
+                    self.counters["near_hits"] += 1
+                    return self._entries[best_key]["response"]
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, model: str, prompt: str, temperature: float, response: str, scope: Optional[str] = None,
+            question: Optional[str] = None) -> None:
+        key = self.key(model, prompt, temperature)
+        scope_key = self.scope_key(model, scope, temperature) if scope is not None and question else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = {
+                "response": response,
+                "expires_at": time.time() + self.ttl_seconds,
+                "scope": scope_key,
+                "tokens": _tokens(question) if scope_key else frozenset()
+            }
+            if scope_key:
+                self._scopes.setdefault(scope_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["near_hits"] + self.counters["misses"]
+            served = self.counters["hits"] + self.counters["near_hits"]
+            return {
+                "enabled": LLM_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "near_duplicates": self.near_duplicates,
+                **self.counters,
+                "hit_rate": round(served / lookups, 4) if lookups else None
+            }
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = LLMResponseCache()
+    return _cache
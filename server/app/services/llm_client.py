@@ -0,0 +1,231 @@
+# app/services/llm_client.py
+
+import os
+import json
+import time
+import random
+import asyncio
+from typing import Dict, List, Optional, AsyncIterator
+
+import httpx
+from dotenv import load_dotenv
+
+from app.services.llm_cache import get_llm_cache, LLM_CACHE_ENABLED
+
+load_dotenv()
+
+LLM_API_URL = os.getenv("GROQ_API_URL")
+LLM_API_KEY = os.getenv("GROQ_API_KEY")
+LLM_MODEL = os.getenv("GROQ_MODEL")
+# Requests in flight per process; the rest wait on the semaphore instead of piling onto the provider
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_CONNECT_TIMEOUT_SECONDS = 10.0
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_SECONDS = 0.5
+LLM_MAX_BACKOFF_SECONDS = 8.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """The provider answered with an error, or did not answer within the retry budget"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMClient:
+    """
+    Chat-completions client on one shared httpx.AsyncClient: pooled keep-alive
+    connections, connect/read timeouts, at most `max_concurrency` requests in
+    flight, and retries with exponential backoff (honouring Retry-After) on
+    429, 5xx, timeouts and dropped connections.
+
+    The connection pool belongs to an event loop, so it is rebuilt when called
+    from a new loop (job workers run each call under asyncio.run).
+    """
+
+    def __init__(
+        self,
+        api_url: str = LLM_API_URL,
+        api_key: str = LLM_API_KEY,
+        model: str = LLM_MODEL,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+        self.max_retries = max_retries
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "seconds": 0.0}
+
+    def _session(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=self.transport,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_MAX_BACKOFF_SECONDS)
+            except ValueError:
+                pass
+        delay = min(LLM_BACKOFF_SECONDS * 2 ** attempt, LLM_MAX_BACKOFF_SECONDS)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.5,
+                   model: Optional[str] = None) -> str:
+        """Content of the first choice; raises LLMError once retries are exhausted"""
+        client = self._session()
+        payload = {"model": model or self.model, "messages": messages, "temperature": temperature}
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                start = time.perf_counter()
+                self.counters["requests"] += 1
+                try:
+                    response = await client.post(self.api_url, json=payload)
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    if attempt == self.max_retries:
+                        self.counters["failures"] += 1
+                        raise LLMError(f"LLM request failed: {e!r}")
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                finally:
+                    self.counters["seconds"] += time.perf_counter() - start
+
+                if response.status_code == 200:
+                    return response.json()["choices"][0]["message"]["content"]
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    self.counters["retries"] += 1
+                    delay = self._backoff(attempt, response)
+                    print(f"⚠️ LLM returned {response.status_code}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self.counters["failures"] += 1
+                raise LLMError(response.text, status_code=response.status_code)
+
+    async def stream_chat(self, messages: List[Dict[str, str]], temperature: float = 0.5,
+                          model: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield the answer's text deltas as the provider streams them (OpenAI-style
+        SSE chunks). Retries apply only until the response starts; a stream
+        that breaks midway raises LLMError. Logs time to first token.
+        """
+        client = self._session()
+        payload = {"model": model or self.model, "messages": messages, "temperature": temperature, "stream": True}
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            first_token, chunks = None, 0
+            for attempt in range(self.max_retries + 1):
+                self.counters["requests"] += 1
+                try:
+                    async with client.stream("POST", self.api_url, json=payload) as response:
+                        if response.status_code != 200:
+                            body = (await response.aread()).decode("utf-8", errors="replace")
+                            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                                self.counters["retries"] += 1
+                                await asyncio.sleep(self._backoff(attempt, response))
+                                continue
+                            self.counters["failures"] += 1
+                            raise LLMError(body, status_code=response.status_code)
+
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                break
+                            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                            if delta:
+                                if first_token is None:
+                                    first_token = time.perf_counter() - start
+                                    print(f"[LLM] Time to first token: {first_token:.2f}s")
+                                chunks += 1
+                                yield delta
+                    break
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    # Once tokens went out a retry would repeat them, so only a silent failure is retried
+                    if first_token is not None or attempt == self.max_retries:
+                        self.counters["failures"] += 1
+                        raise LLMError(f"LLM stream failed: {e!r}")
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(self._backoff(attempt))
+
+            seconds = time.perf_counter() - start
+            self.counters["seconds"] += seconds
+            print(f"[LLM] Stream finished: {chunks} chunks in {seconds:.2f}s")
+
+    async def complete(self, prompt: str, temperature: float = 0.5, cache_scope: Optional[str] = None,
+                       cache_question: Optional[str] = None) -> str:
+        """
+        Single-prompt chat through the response cache (services/llm_cache.py).
+        Pass the chat context as `cache_scope` and the user's question as
+        `cache_question` to allow near-duplicate matches; errors are never cached.
+        """
+        cache = get_llm_cache() if LLM_CACHE_ENABLED else None
+        if cache is not None:
+            cached = cache.get(self.model, prompt, temperature, scope=cache_scope, question=cache_question)
+            if cached is not None:
+                return cached
+        reply = await self.chat([{"role": "user", "content": prompt}], temperature=temperature)
+        if cache is not None:
+            cache.put(self.model, prompt, temperature, reply, scope=cache_scope, question=cache_question)
+        return reply
+
+    async def stream_complete(self, prompt: str, temperature: float = 0.5, cache_scope: Optional[str] = None,
+                              cache_question: Optional[str] = None) -> AsyncIterator[str]:
+        """Streaming counterpart of complete(): a cached answer is yielded as one chunk"""
+        cache = get_llm_cache() if LLM_CACHE_ENABLED else None
+        if cache is not None:
+            cached = cache.get(self.model, prompt, temperature, scope=cache_scope, question=cache_question)
+            if cached is not None:
+                yield cached
+                return
+        parts = []
+        async for token in self.stream_chat([{"role": "user", "content": prompt}], temperature=temperature):
+            parts.append(token)
+            yield token
+        if cache is not None:
+            cache.put(self.model, prompt, temperature, "".join(parts), scope=cache_scope, question=cache_question)
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    global _client
+    if _client is None:
+        _client = LLMClient()
+    return _client
+
+
+async def close_llm_client() -> None:
+    if _client is not None:
+        await _client.aclose()
@@ -0,0 +1,93 @@
+# app/services/ocr_cache.py
+
+import os
+import json
+import hashlib
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.utils.disk_cache import DiskCache, code_version
+
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "outputs/cache/ocr")
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+_cache: Optional[DiskCache] = None
+
+
+def get_ocr_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES, name="ocr")
+    return _cache
+
+
+def pdf_cache_key(pdf_digest: str, settings: Dict[str, Any]) -> str:
+    """Whole-document key: PDF bytes, extraction settings (DPI, text layer on/off) and code version"""
+    payload = json.dumps({"pdf": pdf_digest, "settings": settings, "code": code_version()}, sort_keys=True)
+    return "pdf:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def region_cache_key(gray: np.ndarray) -> str:
+    """Exact pixel hash of a cropped chart, so the same chart in a refreshed report is recognised"""
+    digest = hashlib.sha256(str(gray.shape).encode("utf-8"))
+    digest.update(np.ascontiguousarray(gray).tobytes())
+    return "region:" + digest.hexdigest()
+
+
+def load_pages(key: str, pdf_size: int) -> Optional[List[Dict[str, Any]]]:
+    if not OCR_CACHE_ENABLED:
+        return None
+    try:
+        data = get_ocr_cache().get_bytes(key)
+        if data is None:
+            return None
+        get_ocr_cache().incr("pdf_hits")
+        get_ocr_cache().incr("bytes_saved", pdf_size)
+        return json.loads(data)
+    except Exception as e:
+        print(f"⚠️ OCR cache read failed: {e}")
+        return None
+
+
+def store_pages(key: str, pages: List[Dict[str, Any]]) -> None:
+    if not OCR_CACHE_ENABLED:
+        return
+    try:
+        get_ocr_cache().put_bytes(key, json.dumps(pages).encode("utf-8"))
+    except Exception as e:
+        # A cache failure must never fail the extraction itself
+        print(f"⚠️ Could not cache OCR pages: {e}")
+
+
+def load_region_text(key: str, region_bytes: int) -> Optional[str]:
+    if not OCR_CACHE_ENABLED:
+        return None
+    try:
+        data = get_ocr_cache().get_bytes(key)
+        if data is None:
+            return None
+        get_ocr_cache().incr("region_hits")
+        get_ocr_cache().incr("bytes_saved", region_bytes)
+        return data.decode("utf-8")
+    except Exception as e:
+        print(f"⚠️ OCR cache read failed: {e}")
+        return None
+
+
+def store_region_text(key: str, text: str) -> None:
+    if not OCR_CACHE_ENABLED:
+        return
+    try:
+        get_ocr_cache().put_bytes(key, text.encode("utf-8"))
+    except Exception as e:
+        print(f"⚠️ Could not cache OCR region: {e}")
+
+
+def ocr_cache_stats() -> Dict[str, Any]:
+    """Hit rate over document and region lookups; bytes_saved counts PDF bytes and region pixels not OCR'd again"""
+    stats = get_ocr_cache().stats()
+    for counter in ("pdf_hits", "region_hits", "bytes_saved"):
+        stats[counter] = int(stats.get(counter, 0))
+    return {"enabled": OCR_CACHE_ENABLED, **stats}
@@ -1,28 +1,60 @@
 import os
-import cv2
-import pytesseract
-import requests
+import time
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from pdf2image import convert_from_bytes
+from joblib.externals.loky import ProcessPoolExecutor
+
+from app.utils.disk_cache import file_digest
+from app.utils.cpu import JOB_CPU_SHARE
+from app.services.llm_client import get_llm_client, LLMError
+from app.modules.prompt_context import build_prompt_context
+from app.services.ocr_cache import (
+    pdf_cache_key, region_cache_key, load_pages, store_pages, load_region_text, store_region_text
+)
 
 # Load environment variables
 load_dotenv()
 
 # Environment variables
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = os.getenv("GROQ_API_URL")
-GROQ_MODEL = os.getenv("GROQ_MODEL")
 SECRET_KEY = os.getenv("SECRET_KEY")
-pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_PATH")
+TESSERACT_PATH = os.getenv("TESSERACT_PATH")
 
 UPLOAD_FOLDER = "uploads"
 OUTPUT_FOLDER = "outputs"
+OCR_OVERLAY_PATH = "static/charts/ocr_overlay.png"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(JOB_CPU_SHARE)))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+# Idle OCR workers stay alive this long so the next PDF skips the spawn/import cost
+OCR_WORKER_IDLE_SECONDS = 300
+NATIVE_TEXT_ENABLED = os.getenv("PDF_NATIVE_TEXT", "true").lower() == "true"
+# Fewer embedded characters than this and the page is treated as scanned
+NATIVE_TEXT_MIN_CHARS = 20
+# Same minimum chart size as extract_chart_regions, in pixels at OCR_DPI
+CHART_MIN_WIDTH, CHART_MIN_HEIGHT = 200, 150
+
+# OpenCV, Tesseract, pdf2image and PyMuPDF are imported on first use so the API starts without them
+_pymupdf_module = None
+_ocr_executor = None
+_ocr_executor_workers = 0
+
+
+def _pymupdf():
+    """PyMuPDF if installed (optional: reads the embedded text layer so most pages skip OCR), else None"""
+    global _pymupdf_module
+    if _pymupdf_module is None:
+        try:
+            import pymupdf
+            _pymupdf_module = pymupdf
+        except ImportError:
+            _pymupdf_module = False
+    return _pymupdf_module or None
 
 
 
-def extract_chart_regions(image):
+def extract_chart_regions(image, overlay_path=OCR_OVERLAY_PATH):
+    import cv2
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     _, thresh = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
     contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -33,26 +65,182 @@ def extract_chart_regions(image):
             chart_img = image[y:y + h, x:x + w]
             cropped.append(chart_img)
             cv2.rectangle(image, (x, y), (x + w, y + h), (0, 255, 0), 2)
-    cv2.imwrite("static/charts/ocr_overlay.png", image)
+    if overlay_path:
+        cv2.imwrite(overlay_path, image)
     return cropped
 
 def ocr_chart(img):
-    print("🔍 Performing OCR on chart...")
+    import cv2
+    import pytesseract
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    return pytesseract.image_to_string(gray)
+    key = region_cache_key(gray)
+    text = load_region_text(key, gray.nbytes)
+    if text is not None:
+        return text
+    print("🔍 Performing OCR on chart...")
+    if TESSERACT_PATH:
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
+    text = pytesseract.image_to_string(gray)
+    store_region_text(key, text)
+    return text
+
+def _pixmap_to_array(pixmap):
+    return np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, pixmap.n)[:, :, :3]
+
+def _native_page(file_path, page_number):
+    """
+    Embedded text of one page, plus OCR of only the image regions that carry no
+    text of their own. None when the page has no text layer (a scan).
+    """
+    pymupdf = _pymupdf()
+    start = time.perf_counter()
+    with pymupdf.open(file_path) as doc:
+        page = doc[page_number - 1]
+        blocks = [b for b in page.get_text("blocks", sort=True) if b[6] == 0 and b[4].strip()]
+        if sum(len(b[4].strip()) for b in blocks) < NATIVE_TEXT_MIN_CHARS:
+            return None
+        text = ''.join(b[4].strip() + "\n" for b in blocks)
+        text_seconds = time.perf_counter() - start
+
+        # Raster images (pasted screenshots, image visuals) only: vector charts already gave their labels above
+        scale = OCR_DPI / 72
+        regions = []
+        for image in page.get_image_info():
+            rect = pymupdf.Rect(image["bbox"]) & page.rect
+            if rect.width * scale <= CHART_MIN_WIDTH or rect.height * scale <= CHART_MIN_HEIGHT:
+                continue
+            if any(rect.contains(pymupdf.Point((b[0] + b[2]) / 2, (b[1] + b[3]) / 2)) for b in blocks):
+                continue
+            regions.append(rect)
+        for rect in regions:
+            text += ocr_chart(_pixmap_to_array(page.get_pixmap(dpi=OCR_DPI, clip=rect))) + "\n"
+
+    return {
+        "page": page_number,
+        "method": "text+ocr" if regions else "text",
+        "text": text,
+        "text_blocks": len(blocks),
+        "regions": len(regions),
+        "render_seconds": 0.0,
+        "ocr_seconds": round(time.perf_counter() - start - text_seconds, 3),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+def _render_page(file_path, page_number):
+    pymupdf = _pymupdf()
+    if pymupdf is not None:
+        with pymupdf.open(file_path) as doc:
+            return _pixmap_to_array(doc[page_number - 1].get_pixmap(dpi=OCR_DPI)).copy()
+    from pdf2image import convert_from_path
+    page = convert_from_path(file_path, dpi=OCR_DPI, first_page=page_number, last_page=page_number)[0]
+    return np.array(page)
+
+def ocr_page(file_path, page_number, overlay_path=None):
+    """Text of one page: the embedded text layer when there is one, else rasterize + OCR; runs in an OCR pool worker"""
+    if _pymupdf() is not None and NATIVE_TEXT_ENABLED:
+        result = _native_page(file_path, page_number)
+        if result is not None:
+            return result
+
+    start = time.perf_counter()
+    np_img = _render_page(file_path, page_number)
+    render_seconds = time.perf_counter() - start
+
+    cropped_charts = extract_chart_regions(np_img, overlay_path=overlay_path)
+    text = ''
+    for chart_img in cropped_charts:
+        text += ocr_chart(chart_img) + "\n"
+    return {
+        "page": page_number,
+        "method": "ocr",
+        "text": text,
+        "text_blocks": 0,
+        "regions": len(cropped_charts),
+        "render_seconds": round(render_seconds, 3),
+        "ocr_seconds": round(time.perf_counter() - start - render_seconds, 3),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+def _page_count(file_path):
+    pymupdf = _pymupdf()
+    if pymupdf is not None:
+        with pymupdf.open(file_path) as doc:
+            return doc.page_count
+    from pdf2image import pdfinfo_from_path
+    return pdfinfo_from_path(file_path)["Pages"]
+
+def _get_ocr_executor(n_workers):
+    """OCR's own pool, separate from the training pool so neither tears down the other's workers"""
+    global _ocr_executor, _ocr_executor_workers
+    if _ocr_executor is None or _ocr_executor_workers < n_workers:
+        if _ocr_executor is not None:
+            _ocr_executor.shutdown(wait=False)
+        # Tesseract's own OpenMP threads would oversubscribe the cores next to our workers
+        _ocr_executor = ProcessPoolExecutor(max_workers=n_workers, timeout=OCR_WORKER_IDLE_SECONDS,
+                                            env={"OMP_THREAD_LIMIT": "1"})
+        _ocr_executor_workers = n_workers
+    return _ocr_executor
+
+def extract_pages_from_pdf(file_path, n_workers=None):
+    """
+    Text of every page of a PDF, one page per task on a pool of OCR_WORKERS processes.
+    Each worker reads or rasterizes only its own page, so the whole document is never
+    in memory at once. Returns per-page results (text, method, region count, timings)
+    in page order.
+    """
+    global _ocr_executor
+    page_count = _page_count(file_path)
+    n_workers = max(1, min(n_workers or OCR_WORKERS, page_count))
+    # The overlay image keeps showing the last page, as it did when pages were processed in order
+    overlays = {page_count: OCR_OVERLAY_PATH}
+
+    if n_workers == 1:
+        return [ocr_page(file_path, number, overlays.get(number)) for number in range(1, page_count + 1)]
+
+    print(f"🔍 OCR on {page_count} pages with {n_workers} workers...")
+    executor = _get_ocr_executor(n_workers)
+    try:
+        futures = [executor.submit(ocr_page, file_path, number, overlays.get(number))
+                   for number in range(1, page_count + 1)]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); the next PDF gets a fresh pool
+        _ocr_executor = None
+        raise
 
 def extract_text_from_pdf(file_path):
+    """
+    Text of a PDF and how it was obtained: (text, stats), where stats has the
+    per-page method, region count and timings, the method counts, whether the
+    pages came from the OCR cache, and the total seconds.
+    """
     print("🔍 Extracting text from PDF...")
-    with open(file_path, 'rb') as f:
-        images = convert_from_bytes(f.read())
-    full_text = ''
-    for page in images:
-        np_img = np.array(page)
-        cropped_charts = extract_chart_regions(np_img)
-        for chart_img in cropped_charts:
-            full_text += ocr_chart(chart_img) + "\n"
-    print("🔍 Extracted Chart Text:\n", full_text)
-    return full_text
+    start = time.perf_counter()
+    # The same export arrives through /upload, /chart-talk and from other users: reuse the whole result
+    cache_key = pdf_cache_key(file_digest(file_path), {
+        "dpi": OCR_DPI, "native_text": NATIVE_TEXT_ENABLED and _pymupdf() is not None
+    })
+    pages = load_pages(cache_key, os.path.getsize(file_path))
+    cache_hit = pages is not None
+    if cache_hit:
+        print(f"⚡ OCR cache hit for {os.path.basename(file_path)} ({len(pages)} pages)")
+    else:
+        pages = extract_pages_from_pdf(file_path)
+        store_pages(cache_key, pages)
+    full_text = ''.join(page["text"] for page in pages)
+    for page in pages:
+        print(f"⏱️ Page {page['page']} [{page['method']}]: {page['text_blocks']} text blocks, "
+              f"{page['regions']} OCR regions, render {page['render_seconds']}s, OCR {page['ocr_seconds']}s")
+    methods = pd.Series([page["method"] for page in pages]).value_counts().to_dict()
+    seconds = round(time.perf_counter() - start, 3)
+    print(f"✅ PDF text extracted: {len(pages)} pages in {seconds:.2f}s {methods}")
+    stats = {
+        "pages": [{key: value for key, value in page.items() if key != "text"} for page in pages],
+        "methods": methods,
+        "cache_hit": cache_hit,
+        "seconds": seconds
+    }
+    return full_text, stats
 
 def load_dataset(csv_path):
     try:
@@ -60,36 +248,41 @@ def load_dataset(csv_path):
     except:
         return None
 
-def generate_insight_with_llm(chart_text, df):
+def dataset_preview(df, target_col=None, task_type=None):
+    """Token-budgeted dataset summary (see modules/prompt_context.py), shared by every insight prompt"""
+    if df is None:
+        return "No dataset available."
+    return build_prompt_context(df, target_col=target_col, task_type=task_type)
+
+async def generate_insight_with_llm(chart_text, df, preview=None):
     print("🔍 Generating insights with LLM...")
-    df_preview = df.head(10).to_string() if df is not None else "No dataset available."
+    df_preview = preview if preview is not None else dataset_preview(df)
     prompt = f"""
 You are a data analyst AI. Here is some text extracted from chart regions in a dashboard:
 
 --- Chart Text ---
 {chart_text}
 
---- CSV Dataset Preview ---
+--- Dataset Summary ---
 {df_preview}
 
 Please generate 3-5 meaningful business insights based on trends shown in the charts.
 """
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-    payload = {
-        "model": GROQ_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.5
-    }
-    response = requests.post(GROQ_API_URL, headers=headers, json=payload)
-    return response.json()['choices'][0]['message']['content'] if response.status_code == 200 else f"Error: {response.text}"
+    try:
+        return await get_llm_client().complete(prompt, temperature=0.5)
+    except LLMError as e:
+        return f"Error: {e}"
 
-def ask_groq_about_chart(question, context):
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
+async def ask_groq_about_chart(question, context):
     prompt = f"Context: {context}\n\nUser: {question}"
-    payload = {
-        "model": GROQ_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.5
-    }
-    response = requests.post(GROQ_API_URL, headers=headers, json=payload)
-    return response.json()['choices'][0]['message']['content'] if response.status_code == 200 else f"Error: {response.text}"
+    try:
+        return await get_llm_client().complete(prompt, temperature=0.5, cache_scope=context, cache_question=question)
+    except LLMError as e:
+        return f"Error: {e}"
+
+async def stream_groq_about_chart(question, context):
+    """Same prompt as ask_groq_about_chart, yielded token by token; raises LLMError on failure"""
+    prompt = f"Context: {context}\n\nUser: {question}"
+    async for token in get_llm_client().stream_complete(prompt, temperature=0.5, cache_scope=context,
+                                                         cache_question=question):
+        yield token
@@ -0,0 +1,98 @@
+# app/services/result_cache.py
+
+import os
+import io
+import json
+import hashlib
+from typing import Dict, Any, Optional
+
+import joblib
+import pandas as pd
+
+from app.utils.disk_cache import DiskCache, code_version
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "outputs/cache/results")
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "2048")) * 1024 * 1024
+# Entry files holding the report's artifacts (EDA PDF, plots) start with this
+ARTIFACT_PREFIX = "artifact_"
+
+_cache: Optional[DiskCache] = None
+
+
+def get_result_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES, name="results")
+    return _cache
+
+
+def result_cache_key(file_digests: Dict[str, Optional[str]], params: Dict[str, Any]) -> str:
+    payload = json.dumps({"files": file_digests, "params": params, "code": code_version()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _frame_bytes(df: pd.DataFrame) -> Dict[str, bytes]:
+    buffer = io.BytesIO()
+    try:
+        df.to_parquet(buffer, index=False)
+        return {"cleaned.parquet": buffer.getvalue()}
+    except Exception as e:
+        # No parquet engine installed or a column type it cannot store
+        print(f"⚠️ Parquet unavailable for cached dataset ({e}); storing a pickle instead")
+        buffer = io.BytesIO()
+        df.to_pickle(buffer)
+        return {"cleaned.pkl": buffer.getvalue()}
+
+
+def store_result(key: str, clean_df: pd.DataFrame, model: Any, result: Dict[str, Any],
+                 artifacts: Dict[str, str] = None) -> None:
+    """
+    Cache the cleaned dataset, trained model and job result (incl. EDA summary
+    and LLM insights). `artifacts` maps a name to a file the result refers to
+    (EDA PDF, plots); a copy is kept with the entry.
+    """
+    if not RESULT_CACHE_ENABLED:
+        return
+    try:
+        model_buffer, result_buffer = io.BytesIO(), io.BytesIO()
+        joblib.dump(model, model_buffer)
+        joblib.dump({"result": result}, result_buffer)
+        files = _frame_bytes(clean_df)
+        files["model.joblib"] = model_buffer.getvalue()
+        files["result.joblib"] = result_buffer.getvalue()
+        files.update({ARTIFACT_PREFIX + name: path for name, path in (artifacts or {}).items()})
+        get_result_cache().put(key, files)
+        print(f"💾 Cached pipeline result {key[:12]}")
+    except Exception as e:
+        # A cache failure must never fail the upload itself
+        print(f"⚠️ Could not cache pipeline result: {e}")
+
+
+def load_result(key: str) -> Optional[Dict[str, Any]]:
+    """The cached bundle for `key` ({clean_df, model, result, artifacts}), or None; artifacts are paths in the entry"""
+    if not RESULT_CACHE_ENABLED:
+        return None
+    try:
+        folder = get_result_cache().get(key)
+        if folder is None:
+            return None
+        parquet = os.path.join(folder, "cleaned.parquet")
+        clean_df = pd.read_parquet(parquet) if os.path.exists(parquet) \
+            else pd.read_pickle(os.path.join(folder, "cleaned.pkl"))
+        bundle = joblib.load(os.path.join(folder, "result.joblib"))
+        return {
+            "clean_df": clean_df,
+            "model": joblib.load(os.path.join(folder, "model.joblib")),
+            "result": bundle["result"],
+            "artifacts": {name[len(ARTIFACT_PREFIX):]: os.path.join(folder, name)
+                          for name in os.listdir(folder) if name.startswith(ARTIFACT_PREFIX)}
+        }
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable cache entry {key[:12]}: {e}")
+        get_result_cache().delete(key)
+        return None
+
+
+def result_cache_stats() -> Dict[str, Any]:
+    return {"enabled": RESULT_CACHE_ENABLED, "code_version": code_version(), **get_result_cache().stats()}
@@ -0,0 +1,153 @@
+# app/services/session_cache.py
+
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "true").lower() == "true"
+# How long a valid session is trusted without asking Mongo. Without a shared backend this is
+# also how long a logout can take to reach the other workers.
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "30"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+# Optional backend shared by all workers, e.g. redis://localhost:6379/0 (needs the redis package)
+SESSION_CACHE_REDIS_URL = os.getenv("SESSION_CACHE_REDIS_URL")
+SESSION_CACHE_REDIS_PREFIX = "session:valid:"
+AUTH_LATENCY_SAMPLES = 1000
+
+
+class SessionCache:
+    """
+    Cache of "this session is still valid", so authenticated requests skip
+    the sessions_collection lookup. Only valid sessions are cached; logout
+    removes the entry through invalidate().
+
+    Entries live in this process unless a Redis URL is given. Redis then
+    replaces the in-process layer, so an invalidation is seen by every
+    worker at once. If Redis fails, requests go to Mongo.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SESSION_CACHE_TTL_SECONDS,
+        max_entries: int = SESSION_CACHE_MAX_ENTRIES,
+        redis_url: Optional[str] = SESSION_CACHE_REDIS_URL
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_url = redis_url
+        self._redis = None
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._latencies: deque = deque(maxlen=AUTH_LATENCY_SAMPLES)
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0, "backend_errors": 0, "auth_requests": 0}
+
+    def _backend(self):
+        if self.redis_url and self._redis is None:
+            try:
+                import redis.asyncio as redis_asyncio
+                self._redis = redis_asyncio.from_url(self.redis_url)
+                print("✅ Session cache using Redis")
+            except ImportError:
+                print("⚠️ SESSION_CACHE_REDIS_URL is set but redis is not installed; caching in process")
+                self.redis_url = None
+        return self._redis
+
+    async def _get(self, session_id: str) -> bool:
+        redis = self._backend()
+        if redis is not None:
+            return bool(await redis.exists(SESSION_CACHE_REDIS_PREFIX + session_id))
+        expires_at = self._entries.get(session_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._entries[session_id]
+            return False
+        return True
+
+    async def _put(self, session_id: str) -> None:
+        redis = self._backend()
+        if redis is not None:
+            await redis.set(SESSION_CACHE_REDIS_PREFIX + session_id, 1, ex=max(int(self.ttl_seconds), 1))
+            return
+        self._entries[session_id] = time.time() + self.ttl_seconds
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def is_valid(self, session_id: str, lookup: Callable[[str], Awaitable[bool]]) -> bool:
+        """Cached validity of `session_id`; on a miss `lookup` asks the database"""
+        if not SESSION_CACHE_ENABLED:
+            return await lookup(session_id)
+        try:
+            if await self._get(session_id):
+                self.counters["hits"] += 1
+                return True
+        except Exception as e:
+            # The cache is only a shortcut: when the backend is down, the database decides
+            self.counters["backend_errors"] += 1
+            print(f"⚠️ Session cache read failed: {e}")
+        self.counters["misses"] += 1
+
+        valid = await lookup(session_id)
+        if valid:
+            try:
+                await self._put(session_id)
+            except Exception as e:
+                self.counters["backend_errors"] += 1
+                print(f"⚠️ Could not cache session: {e}")
+        return valid
+
+    async def invalidate(self, session_id: str) -> None:
+        self._entries.pop(session_id, None)
+        self.counters["invalidations"] += 1
+        redis = self._backend()
+        if redis is not None:
+            try:
+                await redis.delete(SESSION_CACHE_REDIS_PREFIX + session_id)
+            except Exception as e:
+                self.counters["backend_errors"] += 1
+                print(f"⚠️ Could not invalidate cached session (expires in {self.ttl_seconds:.0f}s): {e}")
+
+    def record_auth(self, seconds: float) -> None:
+        self.counters["auth_requests"] += 1
+        self._latencies.append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        latencies = sorted(self._latencies)
+        percentile = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 3)
+        return {
+            "enabled": SESSION_CACHE_ENABLED,
+            "backend": "redis" if self.redis_url else "memory",
+            "entries": None if self.redis_url else len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else None,
+            # Whole verify_authentication call, over the last AUTH_LATENCY_SAMPLES requests
+            "auth_latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1] * 1000, 3)
+            } if latencies else None
+        }
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+_cache: Optional[SessionCache] = None
+
+
+def get_session_cache() -> SessionCache:
+    global _cache
+    if _cache is None:
+        _cache = SessionCache()
+    return _cache
+
+
+async def close_session_cache() -> None:
+    if _cache is not None:
+        await _cache.aclose()
@@ -0,0 +1,9 @@
+# app/utils/cpu.py
+
+import os
+
+# Upload jobs running side by side, each in its own process (see services/job_services.py)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Cores each job process may use for its own worker pools (training, OCR), so JOB_WORKERS jobs
+# running side by side do not start JOB_WORKERS x cores processes between them
+JOB_CPU_SHARE = max(1, (os.cpu_count() or 1) // JOB_WORKERS)
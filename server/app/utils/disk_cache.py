@@ -0,0 +1,211 @@
+# app/utils/disk_cache.py
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+from typing import Dict, Any, Optional, Union, Callable, Iterable
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Sources whose changes invalidate cached pipeline results
+PIPELINE_SOURCE_DIRS = ("modules", "services", "controllers")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_code_version: Optional[str] = None
+
+
+def code_version(source_dirs: Iterable[str] = PIPELINE_SOURCE_DIRS) -> str:
+    """CODE_VERSION env var, or a hash of the pipeline sources so any code change invalidates cached results"""
+    global _code_version
+    if _code_version is None:
+        _code_version = os.getenv("CODE_VERSION")
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for folder in source_dirs:
+            root = os.path.join(APP_DIR, folder)
+            for name in sorted(os.listdir(root)):
+                if name.endswith(".py"):
+                    with open(os.path.join(root, name), "rb") as f:
+                        digest.update(name.encode() + f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def file_digest(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Streaming SHA-256 of a file; memory use is one chunk"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed cache on local disk. Each entry is a folder of files
+    (written to a temp folder, then renamed into place), indexed in SQLite so
+    every worker process shares the same LRU order, size total and hit/miss
+    counters. When the total size exceeds `max_bytes`, least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, name: str = "cache"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.name = name
+        os.makedirs(self.directory, exist_ok=True)
+        self.db_path = os.path.join(self.directory, "index.db")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _folder_name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def incr(self, counter: str, amount: float = 1) -> None:
+        with self._connect() as conn:
+            self._incr(conn, counter, amount)
+
+    @staticmethod
+    def _incr(conn: sqlite3.Connection, counter: str, amount: float) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (counter, amount)
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Folder of the entry for `key` (refreshing its LRU position), or None on a miss"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT folder FROM entries WHERE key = ?", (key,)).fetchone()
+            folder = os.path.join(self.directory, row["folder"]) if row else None
+            if folder and os.path.isdir(folder):
+                conn.execute("UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+                self._incr(conn, "hits", 1)
+                return folder
+            if row:
+                # Folder removed behind our back: drop the stale index row
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._incr(conn, "misses", 1)
+        return None
+
+    def put(self, key: str, files: Dict[str, Union[bytes, str, Callable[[str], Any]]]) -> str:
+        """
+        Store an entry made of `files` and return its folder. Each value is the
+        file's bytes, the path of a file to copy, or a callable that writes the
+        file to the path it is given. An existing entry for `key` is replaced.
+        """
+        tmp = tempfile.mkdtemp(prefix=".tmp_", dir=self.directory)
+        size = 0
+        try:
+            for name, content in files.items():
+                target = os.path.join(tmp, name)
+                if isinstance(content, bytes):
+                    with open(target, "wb") as f:
+                        f.write(content)
+                elif callable(content):
+                    content(target)
+                else:
+                    shutil.copyfile(content, target)
+                size += os.path.getsize(target)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        folder_name = self._folder_name(key)
+        folder = os.path.join(self.directory, folder_name)
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp, folder)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, folder, size, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, folder_name, size, now, now)
+            )
+        self._evict()
+        return folder
+
+    def get_bytes(self, key: str, name: str = "value") -> Optional[bytes]:
+        folder = self.get(key)
+        if folder is None:
+            return None
+        with open(os.path.join(folder, name), "rb") as f:
+            return f.read()
+
+    def put_bytes(self, key: str, data: bytes, name: str = "value") -> str:
+        return self.put(key, {name: data})
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT folder FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        if row:
+            shutil.rmtree(os.path.join(self.directory, row["folder"]), ignore_errors=True)
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            folders = [row["folder"] for row in conn.execute("SELECT folder FROM entries")]
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+        for folder in folders:
+            shutil.rmtree(os.path.join(self.directory, folder), ignore_errors=True)
+
+    def _evict(self) -> None:
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = []
+            for row in conn.execute("SELECT key, folder, size FROM entries ORDER BY last_access ASC").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (row["key"],))
+                total -= row["size"]
+                evicted.append(row["folder"])
+            self._incr(conn, "evictions", len(evicted))
+        for folder in evicted:
+            shutil.rmtree(os.path.join(self.directory, folder), ignore_errors=True)
+        print(f"[CACHE] {self.name}: evicted {len(evicted)} entries to stay under {self.max_bytes} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = {row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM counters")}
+        hits, misses = int(counters.pop("hits", 0)), int(counters.pop("misses", 0))
+        lookups = hits + misses
+        return {
+            "name": self.name,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "evictions": int(counters.pop("evictions", 0)),
+            **counters
+        }
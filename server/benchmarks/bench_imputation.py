@@ -0,0 +1,97 @@
+"""
+Time and accuracy of the imputation strategies at several dataset sizes.
+
+    python -m benchmarks.bench_imputation --rows 10000 100000 1000000
+
+Values are removed at random from a synthetic frame with correlated columns;
+`rmse` compares the imputed numeric cells with the removed originals.
+`legacy_knn` is the previous full-matrix KNNImputer.fit_transform and
+`knn` is exact KNN restricted to incomplete rows; both are only run up to
+--knn-max-rows because their cost grows with rows x rows.
+"""
+
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+
+from app.modules.imputation import impute_frame
+
+STRATEGIES = ["auto", "knn", "approx_knn", "iterative", "median"]
+NUMERIC = ["age", "income", "spend", "score"]
+
+
+def make_frame(rows: int, missing_rate: float, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    age = rng.integers(18, 90, rows).astype(float)
+    income = 800 * age + rng.normal(20_000, 8_000, rows)
+    spend = 0.3 * income + rng.normal(0, 2_000, rows)
+    full = pd.DataFrame({
+        "age": age,
+        "income": income,
+        "spend": spend,
+        "score": rng.random(rows),
+        "city": rng.choice(["Delhi", "Mumbai", "Pune", "Jaipur", "Indore"], rows).astype(object),
+    })
+    holed = full.copy()
+    for col in full.columns:
+        holed.loc[rng.random(rows) < missing_rate, col] = np.nan
+    return full, holed
+
+
+def rmse(full: pd.DataFrame, holed: pd.DataFrame, imputed: pd.DataFrame) -> float:
+    errors = []
+    for col in NUMERIC:
+        mask = holed[col].isna().to_numpy()
+        scale = full[col].std()
+        errors.append(((imputed[col].to_numpy(dtype=float)[mask] - full[col].to_numpy()[mask]) / scale) ** 2)
+    return round(float(np.sqrt(np.concatenate(errors).mean())), 4)
+
+
+def run_legacy(holed: pd.DataFrame) -> pd.DataFrame:
+    encoded = holed.copy()
+    encoded["city"] = pd.factorize(encoded["city"].astype(str))[0]
+    return pd.DataFrame(KNNImputer(n_neighbors=5).fit_transform(encoded), columns=holed.columns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="Share of cells removed per column")
+    parser.add_argument("--knn-max-rows", type=int, default=100_000)
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        full, holed = make_frame(rows, args.missing_rate)
+        runs = ["legacy_knn"] + args.strategies
+        for strategy in runs:
+            if strategy in ("legacy_knn", "knn") and rows > args.knn_max_rows:
+                results.append({"rows": rows, "strategy": strategy, "skipped": f"rows > {args.knn_max_rows}"})
+                continue
+            start = time.perf_counter()
+            if strategy == "legacy_knn":
+                imputed, info = run_legacy(holed), {"strategy": "legacy_knn"}
+            else:
+                imputed, info = impute_frame(holed, strategy=strategy)
+            wall = time.perf_counter() - start
+            row = {
+                "rows": rows,
+                "strategy": strategy,
+                "resolved": info["strategy"],
+                "rows_imputed": info.get("rows_imputed", int(holed.isna().any(axis=1).sum())),
+                "wall_s": round(wall, 2),
+                "rmse": rmse(full, holed, imputed)
+            }
+            results.append(row)
+            print(json.dumps(row), flush=True)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
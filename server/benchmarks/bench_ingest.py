@@ -0,0 +1,110 @@
+"""
+Compare the old upload ingestion path with the streaming/compact one.
+
+    python -m benchmarks.bench_ingest --rows 2000000
+
+Each path runs in a fresh subprocess so peak RSS (ru_maxrss) is measured in isolation.
+Wall time covers the copy to disk plus parsing.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 1024 * 1024
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_csv(path: str, rows: int) -> None:
+    rng = np.random.default_rng(42)
+    block = 500_000
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        pd.DataFrame({
+            "customer_id": np.arange(start, start + n),
+            "age": rng.integers(18, 90, n),
+            "income": rng.normal(55_000, 12_000, n).round(2),
+            "score": rng.random(n),
+            "city": rng.choice(["Delhi", "Mumbai", "Pune", "Jaipur", "Indore"], n),
+            "segment": rng.choice(["A", "B", "C"], n),
+            "churn": rng.integers(0, 2, n),
+        }).to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def run_old(src: str, dst: str) -> pd.DataFrame:
+    # Mirrors the previous upload_dataset: whole body in memory, then the python parser
+    with open(src, "rb") as f:
+        data = f.read()
+    with open(dst, "wb") as f:
+        f.write(data)
+    return pd.read_csv(dst, encoding='utf-8', engine='python')
+
+
+def run_new(src: str, dst: str) -> pd.DataFrame:
+    from app.services.ingest_services import read_csv_compact
+
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        while True:
+            chunk = fin.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            fout.write(chunk)
+    return read_csv_compact(dst)
+
+
+def measure(mode: str, src: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        dst = os.path.join(tmp, "upload.csv")
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_ingest", "--worker", mode, src, dst],
+            cwd=SERVER_DIR, check=True, capture_output=True, text=True
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--csv", help="Use an existing CSV instead of generating one")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "SRC", "DST"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, src, dst = args.worker
+        start = time.perf_counter()
+        df = (run_old if mode == "old" else run_new)(src, dst)
+        wall = time.perf_counter() - start
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(json.dumps({
+            "mode": mode,
+            "rows": len(df),
+            "wall_s": round(wall, 2),
+            "peak_rss_mb": round(peak_kb / 1024, 1),
+            "frame_mb": round(df.memory_usage(deep=True).sum() / (1024 * 1024), 1)
+        }))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = args.csv or os.path.join(tmp, "bench.csv")
+        if not args.csv:
+            print(f"Generating {args.rows:,} rows...")
+            make_csv(src, args.rows)
+        size_mb = os.path.getsize(src) / (1024 * 1024)
+        print(f"Input: {size_mb:.1f} MB")
+
+        results = [measure("old", src), measure("new", src)]
+        for row in results:
+            row["rss_to_input_ratio"] = round(row["peak_rss_mb"] / size_mb, 2)
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Throughput of the async LLM client against a local stub provider.
+
+    python -m benchmarks.bench_llm_client --requests 64 --latency 0.2 --concurrency 1 4 16
+
+The stub answers every chat completion after --latency seconds and returns
+429 (with Retry-After: 0) for a --rate-limited fraction of requests, so the
+retry path is exercised too. `blocking` is the previous requests.post loop,
+one call after another; the other rows fire all requests at once through
+LLMClient with the given concurrency limit.
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+
+import requests
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.services.llm_client import LLMClient
+
+
+def make_stub(latency: float, rate_limited: float) -> FastAPI:
+    stub = FastAPI()
+    rng = random.Random(0)
+
+    @stub.post("/chat/completions")
+    async def chat(request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        if rng.random() < rate_limited:
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "0"})
+        reply = f"echo: {body['messages'][-1]['content'][:20]}"
+        return {"choices": [{"message": {"role": "assistant", "content": reply}}]}
+
+    return stub
+
+
+def start_stub(port: int, latency: float, rate_limited: float) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(make_stub(latency, rate_limited), port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def run_blocking(url: str, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        requests.post(url, json={"model": "stub", "messages": [{"role": "user", "content": f"q{i}"}]})
+    return time.perf_counter() - start
+
+
+async def run_async(url: str, n: int, concurrency: int) -> dict:
+    client = LLMClient(api_url=url, api_key="stub", model="stub", max_concurrency=concurrency)
+    start = time.perf_counter()
+    replies = await asyncio.gather(*(client.complete(f"q{i}") for i in range(n)))
+    seconds = time.perf_counter() - start
+    await client.aclose()
+    assert all(reply.startswith("echo") for reply in replies)
+    return {"seconds": seconds, "retries": client.counters["retries"]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rate-limited", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = start_stub(args.port, args.latency, args.rate_limited)
+    url = f"http://127.0.0.1:{args.port}/chat/completions"
+    rows = []
+    seconds = run_blocking(url, args.requests)
+    rows.append({"client": "blocking", "concurrency": 1, "seconds": round(seconds, 2),
+                 "req_per_s": round(args.requests / seconds, 1)})
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_async(url, args.requests, concurrency))
+        rows.append({"client": "async", "concurrency": concurrency, "seconds": round(result["seconds"], 2),
+                     "req_per_s": round(args.requests / result["seconds"], 1), "retries": result["retries"]})
+    server.should_exit = True
+    for row in rows:
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
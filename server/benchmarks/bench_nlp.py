@@ -0,0 +1,75 @@
+"""
+Cold start and per-call cost of the spaCy pipeline behind generate_questions.
+
+    python -m benchmarks.bench_nlp --texts 200
+
+`cold_start` runs in a fresh interpreter: import spaCy and load the model,
+either the full pipeline (previous import-time load) or without the
+components noun chunking does not use (insight_refiner.NLP_EXCLUDE).
+`per_text` compares nlp(text) one text at a time with nlp.pipe over the
+whole batch. Needs the model (python -m spacy download en_core_web_sm).
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import spacy
+
+from app.modules.insight_refiner import NLP_MODEL, NLP_EXCLUDE, NLP_BATCH_SIZE
+
+SAMPLE = (
+    "Sales in the northern region grew steadily while average order value declined. "
+    "Customer churn is concentrated among users on the monthly plan with low engagement scores."
+)
+
+COLD_START = """
+import time, json
+start = time.perf_counter()
+import spacy
+nlp = spacy.load({model!r}, exclude={exclude!r})
+print(json.dumps({{"seconds": time.perf_counter() - start, "pipes": nlp.pipe_names}}))
+"""
+
+
+def cold_start(exclude) -> dict:
+    out = subprocess.run([sys.executable, "-c", COLD_START.format(model=NLP_MODEL, exclude=list(exclude))],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def per_text(nlp, texts, batched: bool) -> float:
+    start = time.perf_counter()
+    if batched:
+        docs = list(nlp.pipe(texts, batch_size=NLP_BATCH_SIZE))
+    else:
+        docs = [nlp(text) for text in texts]
+    for doc in docs:
+        list(doc.noun_chunks)
+    return (time.perf_counter() - start) / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=200)
+    args = parser.parse_args()
+    texts = [f"{SAMPLE} Insight {i}." for i in range(args.texts)]
+
+    for label, exclude in [("full", []), ("lean", NLP_EXCLUDE)]:
+        start = cold_start(exclude)
+        print(json.dumps({"step": "cold_start", "pipeline": label, "seconds": round(start["seconds"], 3),
+                          "pipes": start["pipes"]}))
+
+    full = spacy.load(NLP_MODEL)
+    lean = spacy.load(NLP_MODEL, exclude=NLP_EXCLUDE)
+    assert [[c.text for c in lean(t).noun_chunks] for t in texts[:5]] == \
+        [[c.text for c in full(t).noun_chunks] for t in texts[:5]]
+    for label, nlp, batched in [("full", full, False), ("lean", lean, False), ("lean", lean, True)]:
+        print(json.dumps({"step": "per_text", "pipeline": label, "batched": batched,
+                          "ms": round(1000 * per_text(nlp, texts, batched), 3)}))
+
+
+if __name__ == "__main__":
+    main()
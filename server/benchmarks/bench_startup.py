@@ -0,0 +1,143 @@
+"""
+Import time and memory of the API at startup.
+
+    python -m benchmarks.bench_startup --top 15
+    python -m benchmarks.bench_startup --check
+    python -m benchmarks.bench_startup --app app.main:app --check
+
+Each run imports --module (comma-separated; by default the API routers) in
+a fresh interpreter under `-X importtime` and aggregates the per-module self
+times: by top-level package (pandas, fastapi, sklearn, ...) and by module
+for the app's own code, along with the wall time of the import and the peak
+RSS of the child process. With --app the FastAPI app is imported too and
+its startup events run (as uvicorn would, through the lifespan), so work
+done in a startup hook counts against the budget; that needs the full
+environment (app.models, static/, a reachable MongoDB). The fastest of
+--repeat runs is reported.
+
+--check exits non-zero when import plus startup takes longer than
+IMPORT_TIME_BUDGET_SECONDS or the process grows past IMPORT_RSS_BUDGET_MB,
+and names any heavy ML/OCR/NLP package that got loaded, so a new eager
+import of sklearn, cv2 or spaCy in a router or a startup hook fails the run.
+"""
+
+import os
+import sys
+import json
+import textwrap
+import argparse
+import subprocess
+from collections import defaultdict
+
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "2.0"))
+IMPORT_RSS_BUDGET_MB = float(os.getenv("IMPORT_RSS_BUDGET_MB", "250"))
+# Must only be imported inside the code paths that use them
+HEAVY_PACKAGES = (
+    "sklearn", "xgboost", "imblearn", "statsmodels", "plotly", "seaborn", "matplotlib",
+    "cv2", "pytesseract", "pdf2image", "pymupdf", "spacy"
+)
+
+DEFAULT_MODULES = "app.routes.ml_routes,app.routes.chart_routes"
+
+CHILD = """
+import sys, time, json, asyncio, importlib, resource
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+app_spec = {app!r}
+if app_spec:
+    module_name, attr = app_spec.split(":")
+    app = getattr(importlib.import_module(module_name), attr)
+seconds = time.perf_counter() - start
+startup_seconds = 0.0
+if app_spec:
+    async def startup():
+        async with app.router.lifespan_context(app):
+            return time.perf_counter()
+    started = time.perf_counter()
+    startup_seconds = asyncio.run(startup()) - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.stdout.write(json.dumps({{"seconds": seconds, "startup_seconds": startup_seconds, "rss_mb": rss_kb / 1024,
+                             "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr: str):
+    """(module, self µs, cumulative µs) for each line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once(modules: list, app: str = None) -> dict:
+    child = CHILD.format(modules=modules, app=app, heavy=HEAVY_PACKAGES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", child], capture_output=True, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise SystemExit(f"❌ Starting {', '.join(modules + ([app] if app else []))} failed:\n"
+                         + textwrap.indent("\n".join(errors[-5:]), "  "))
+    report = json.loads(result.stdout)
+    report["modules"] = parse_importtime(result.stderr)
+    return report
+
+
+def summarise(report: dict, top: int) -> dict:
+    packages = defaultdict(int)
+    own = []
+    for name, self_us, cumulative_us in report["modules"]:
+        root = name.split(".")[0]
+        packages[root] += self_us
+        if root == "app":
+            own.append((name, self_us, cumulative_us))
+    ms = lambda us: round(us / 1000, 1)
+    return {
+        "seconds": round(report["seconds"], 3),
+        "startup_seconds": round(report["startup_seconds"], 3),
+        "rss_mb": round(report["rss_mb"], 1),
+        "modules_imported": len(report["modules"]),
+        "heavy_packages": report["heavy"],
+        "packages_ms": {name: ms(us) for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]},
+        "app_modules_ms": {name: {"self": ms(self_us), "cumulative": ms(cumulative_us)}
+                           for name, self_us, cumulative_us in sorted(own, key=lambda item: -item[2])[:top]}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default=DEFAULT_MODULES)
+    parser.add_argument("--app", default=None, help="module:attribute of a FastAPI app whose startup events to run")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--budget-seconds", type=float, default=IMPORT_TIME_BUDGET_SECONDS)
+    parser.add_argument("--budget-rss-mb", type=float, default=IMPORT_RSS_BUDGET_MB)
+    args = parser.parse_args()
+
+    modules = [name.strip() for name in args.module.split(",") if name.strip()]
+    best = min((run_once(modules, args.app) for _ in range(args.repeat)),
+               key=lambda report: report["seconds"] + report["startup_seconds"])
+    summary = summarise(best, args.top)
+    print(json.dumps(summary, indent=2))
+
+    if args.check:
+        failures = []
+        total = round(summary["seconds"] + summary["startup_seconds"], 3)
+        if total > args.budget_seconds:
+            failures.append(f"import and startup took {total}s (budget {args.budget_seconds}s)")
+        if summary["rss_mb"] > args.budget_rss_mb:
+            failures.append(f"RSS reached {summary['rss_mb']} MB (budget {args.budget_rss_mb} MB)")
+        if summary["heavy_packages"]:
+            failures.append(f"heavy packages imported at startup: {', '.join(summary['heavy_packages'])}")
+        for failure in failures:
+            print(f"❌ {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"✅ Within budget: {total}s, {summary['rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()